@@ -0,0 +1,187 @@
+"""Resúmenes vectorizados de tablas de simulación por hora, día o intervalo.
+
+Agrupa una tabla de columnas (una simulación, un año en streaming cargado
+con ``almacenamiento.load_table`` o una tabla de flota con columna ``site``)
+por cubetas de hora local y calcula en una sola pasada, para cada cubeta,
+el número de muestras, la primera muestra, mínimo, máximo y su posición,
+media ponderada por tiempo, percentiles y la eficiencia (porcentaje del
+tiempo con elevación sobre el umbral, igual que ``TrackingStats``).
+
+Las cubetas se toman de ``local_time``; con columna ``site`` cada sitio tiene
+sus propias cubetas.
+
+Uso desde la línea de comandos (tabla columnar guardada con --formato columnar)::
+
+    python agregacion.py --entrada anual/ --por dia --percentiles 5 50 95 > diario.csv
+"""
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from simulacion import sample_durations
+
+EFFICIENCY_THRESHOLD = 10
+
+_UNITS = {'hour': 'h', 'day': 'D'}
+
+
+def bucket_starts(local_times, by='hour'):
+    """Inicio de la cubeta de cada muestra.
+
+    ``by`` es ``'hour'``, ``'day'`` o un ancho en minutos (entero o
+    ``np.timedelta64``); las cubetas de ancho fijo se alinean a medianoche.
+    """
+    t = np.asarray(local_times, dtype='datetime64[s]')
+    if by in _UNITS:
+        return t.astype(f'datetime64[{_UNITS[by]}]').astype('datetime64[s]')
+    width = np.timedelta64(by, 'm') if not isinstance(by, np.timedelta64) else by
+    width = int(width / np.timedelta64(1, 's'))
+    if width <= 0:
+        raise ValueError("El ancho de la cubeta debe ser positivo")
+    day = t.astype('datetime64[D]').astype('datetime64[s]')
+    return day + ((t - day).astype(np.int64) // width * width).astype('timedelta64[s]')
+
+
+def _group(table, by):
+    """Orden de las muestras, inicios de grupo y claves (sitio, cubeta)"""
+    buckets = bucket_starts(table['local_time'], by).astype(np.int64)
+    sites = np.asarray(table['site']) if 'site' in table else np.zeros(len(buckets), np.int32)
+    ordered = (len(buckets) < 2 or
+               bool(np.all((np.diff(sites) > 0) | ((np.diff(sites) == 0) & (np.diff(buckets) >= 0)))))
+    order = None if ordered else np.lexsort((buckets, sites))
+    if order is not None:
+        buckets, sites = buckets[order], sites[order]
+    change = np.flatnonzero((np.diff(buckets) != 0) | (np.diff(sites) != 0)) + 1
+    starts = np.concatenate([[0], change]) if len(buckets) else np.array([], dtype=np.intp)
+    return order, starts, sites[starts], buckets[starts].astype('datetime64[s]')
+
+
+def _group_percentiles(values, group_ids, starts, counts, percentiles):
+    """Percentiles por grupo (interpolación lineal, como ``np.percentile``)"""
+    order = np.lexsort((values, group_ids))
+    sorted_values = values[order]
+    result = {}
+    for q in percentiles:
+        position = starts + (counts - 1) * (q / 100.0)
+        low = np.floor(position).astype(np.intp)
+        high = np.minimum(low + 1, starts + counts - 1)
+        fraction = position - low
+        result[f"p{q:g}"] = sorted_values[low] * (1 - fraction) + sorted_values[high] * fraction
+    return result
+
+
+def aggregate(table, by='hour', column='elevation', percentiles=(),
+              efficiency_threshold=EFFICIENCY_THRESHOLD):
+    """Resumen de ``column`` por cubeta.
+
+    Devuelve un diccionario de arreglos con una fila por (sitio, cubeta):
+    ``site``, ``bucket`` (inicio en hora local), ``count``, ``first`` (índice
+    de la primera muestra en la tabla), ``min``, ``max``, ``argmax`` (índice
+    en la tabla de la primera muestra con el máximo), ``mean`` (ponderada por
+    el tiempo que representa cada muestra), ``efficiency`` y un ``pNN`` por
+    cada percentil pedido.
+    """
+    order, starts, sites, buckets = _group(table, by)
+    values = np.asarray(table[column], dtype=np.float64)
+    elevations = np.asarray(table['elevation'], dtype=np.float64)
+    weights = sample_durations(table['time'])
+    index = np.arange(len(values))
+    if order is not None:
+        values, elevations, weights, index = (values[order], elevations[order],
+                                              weights[order], index[order])
+    if len(values) == 0:
+        empty = np.array([])
+        return {'site': sites, 'bucket': buckets, 'count': empty.astype(np.int64),
+                'first': empty.astype(np.intp), 'min': empty, 'max': empty,
+                'argmax': empty.astype(np.intp), 'mean': empty, 'efficiency': empty,
+                **{f"p{q:g}": empty for q in percentiles}}
+
+    counts = np.diff(np.append(starts, len(values)))
+    group_ids = np.repeat(np.arange(len(starts)), counts)
+    maxima = np.maximum.reduceat(values, starts)
+    # Primera posición de cada grupo cuyo valor es el máximo del grupo
+    at_max = np.flatnonzero(values == maxima[group_ids])
+    argmax = index[at_max[np.searchsorted(at_max, starts)]]
+    durations = np.add.reduceat(weights, starts)
+    good = np.add.reduceat(np.where(elevations > efficiency_threshold, weights, 0.0), starts)
+    summary = {
+        'site': sites,
+        'bucket': buckets,
+        'count': counts,
+        'first': np.minimum.reduceat(index, starts),
+        'min': np.minimum.reduceat(values, starts),
+        'max': maxima,
+        'argmax': argmax,
+        'mean': np.add.reduceat(values * weights, starts) / durations,
+        'efficiency': good / durations * 100,
+    }
+    if percentiles:
+        summary.update(_group_percentiles(values, group_ids, starts, counts, percentiles))
+    return summary
+
+
+def downsample(table, by='hour'):
+    """Primera muestra de cada cubeta, como una tabla con las mismas columnas"""
+    first = aggregate(table, by)['first']
+    return {name: np.asarray(values)[first] for name, values in table.items()}
+
+
+def summary_lines(table, by='hour'):
+    """Líneas de resumen por cubeta con el formato del reporte"""
+    summary = aggregate(table, by)
+    labels = np.datetime_as_string(summary['bucket'], unit='m')
+    if by == 'day':
+        labels = [label[:10] for label in labels]
+    elif len({label[:10] for label in labels}) == 1:
+        labels = [label[11:] for label in labels]
+    return [f"• {label}: elevacion media {mean:.1f}°, maxima {maximum:.1f}°, "
+            f"eficiencia {efficiency:.0f}%"
+            for label, mean, maximum, efficiency in zip(labels, summary['mean'].tolist(),
+                                                        summary['max'].tolist(),
+                                                        summary['efficiency'].tolist())]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Resumen por hora, día o intervalo de una tabla columnar")
+    parser.add_argument('--entrada', required=True,
+                        help="directorio columnar (ver almacenamiento.py)")
+    parser.add_argument('--por', default='hora',
+                        help="hora, dia o un ancho de cubeta en minutos")
+    parser.add_argument('--columna', default='elevation',
+                        choices=('elevation', 'azimuth', 'pitch', 'roll'),
+                        help="columna a resumir")
+    parser.add_argument('--percentiles', type=float, nargs='*', default=[],
+                        help="percentiles a calcular (0-100)")
+    return parser
+
+
+def main(argv=None):
+    from almacenamiento import load_table
+
+    args = build_parser().parse_args(argv)
+    by = {'hora': 'hour', 'dia': 'day'}.get(args.por)
+    if by is None:
+        try:
+            by = int(args.por)
+        except ValueError:
+            print(f"Error: cubeta desconocida: {args.por}", file=sys.stderr)
+            return 2
+    try:
+        summary = aggregate(load_table(args.entrada), by, args.columna, args.percentiles)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    names = [name for name in summary if name not in ('first', 'argmax')]
+    writer = csv.writer(sys.stdout)
+    writer.writerow(names)
+    for row in zip(*(summary[name] for name in names)):
+        writer.writerow([f"{v:.4f}" if isinstance(v, np.floating) else v for v in row])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
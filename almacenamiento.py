@@ -0,0 +1,138 @@
+"""Formato columnar en disco para las tablas de seguimiento.
+
+Una tabla se guarda como un directorio con un archivo binario crudo por
+columna y un ``meta.json`` que describe tipo y forma de cada una::
+
+    resultado/
+        meta.json
+        time.bin          int64, segundos Unix (UTC)
+        local_time.bin    int64, hora local de pared en segundos
+        elevation.bin     float32 o float64
+        azimuth.bin, pitch.bin, roll.bin
+        sun_vector.bin    (n, 3)
+        site.bin          int32, solo en tablas de flota
+
+Las columnas se escriben por bloques, así que una simulación en streaming
+se puede exportar sin tenerla completa en memoria, y ``load_table`` las
+abre con ``np.memmap`` para recortar resultados de varios GB sin leerlos
+enteros.
+"""
+import json
+import os
+
+import numpy as np
+
+FORMAT_NAME = "seguidor-columnar"
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+_TIME_COLUMNS = ('time', 'local_time')
+_FLOAT_COLUMNS = ('elevation', 'azimuth', 'pitch', 'roll', 'sun_vector')
+
+
+class TableWriter:
+    """Escribe una tabla columnar bloque a bloque.
+
+    ``float_dtype`` controla la precisión de los ángulos y vectores
+    (``float32`` reduce el tamaño a la mitad). Los nombres de sitio opcionales
+    se guardan en los metadatos para las tablas de flota.
+    """
+
+    def __init__(self, path, float_dtype=np.float32, sites=None):
+        self.path = path
+        self.float_dtype = np.dtype(float_dtype)
+        self.sites = list(sites) if sites is not None else None
+        self.rows = 0
+        self._files = {}
+        self._columns = {}
+        os.makedirs(path, exist_ok=True)
+
+    def _dtype_for(self, name):
+        if name in _TIME_COLUMNS:
+            return np.dtype(np.int64)
+        if name in _FLOAT_COLUMNS:
+            return self.float_dtype
+        if name == 'site':
+            return np.dtype(np.int32)
+        raise ValueError(f"Columna desconocida: {name}")
+
+    def append(self, chunk):
+        """Agrega un bloque (diccionario de columnas) al final de la tabla"""
+        n = len(chunk['time'])
+        if self._files and set(chunk) != set(self._files):
+            raise ValueError("Todos los bloques deben tener las mismas columnas")
+        for name, values in chunk.items():
+            values = np.asarray(values)
+            if len(values) != n:
+                raise ValueError(f"La columna {name} no tiene {n} filas")
+            if name in _TIME_COLUMNS:
+                values = values.astype('datetime64[s]').astype(np.int64)
+            values = np.ascontiguousarray(values, dtype=self._dtype_for(name))
+            if name not in self._files:
+                self._files[name] = open(os.path.join(self.path, f"{name}.bin"), 'wb')
+                self._columns[name] = {'dtype': values.dtype.str, 'shape': list(values.shape[1:])}
+            self._files[name].write(values.tobytes())
+        self.rows += n
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        meta = {
+            'format': FORMAT_NAME,
+            'version': FORMAT_VERSION,
+            'rows': self.rows,
+            'columns': self._columns,
+        }
+        if self.sites is not None:
+            meta['sites'] = self.sites
+        with open(os.path.join(self.path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_table(table, path, float_dtype=np.float32, sites=None):
+    """Guarda una tabla completa en formato columnar"""
+    with TableWriter(path, float_dtype, sites) as writer:
+        writer.append(table)
+
+
+def read_meta(path):
+    """Lee y valida los metadatos de una tabla columnar"""
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != FORMAT_NAME:
+        raise ValueError(f"{path} no es una tabla columnar del seguidor")
+    if meta.get('version', 0) > FORMAT_VERSION:
+        raise ValueError(f"Versión de formato no soportada: {meta['version']}")
+    return meta
+
+
+def load_table(path, mmap=True):
+    """Abre una tabla columnar.
+
+    Con ``mmap=True`` cada columna es un ``np.memmap`` de solo lectura: los
+    datos se leen del disco únicamente al acceder a ellos. Las columnas de
+    tiempo se devuelven como vistas ``datetime64[s]`` sin copia.
+    """
+    meta = read_meta(path)
+    rows = meta['rows']
+    table = {}
+    for name, info in meta['columns'].items():
+        dtype = np.dtype(info['dtype'])
+        shape = (rows, *info['shape'])
+        filename = os.path.join(path, f"{name}.bin")
+        if rows == 0:
+            values = np.empty(shape, dtype=dtype)
+        elif mmap:
+            values = np.memmap(filename, dtype=dtype, mode='r', shape=shape)
+        else:
+            values = np.fromfile(filename, dtype=dtype).reshape(shape)
+        if name in _TIME_COLUMNS:
+            values = values.view('datetime64[s]')
+        table[name] = values
+    return table
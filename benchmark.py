@@ -0,0 +1,299 @@
+"""Banco de pruebas de rendimiento sin interfaz gráfica.
+
+Mide los caminos críticos de la simulación con parámetros reproducibles:
+
+* ``ephemeris``: simulación de una ventana diaria para N sitios (muestras/s),
+* ``geometry``: geometría precalculada de todos los cuadros (cuadros/s),
+* ``geometry_scalar``: geometría cuadro a cuadro con ``create_panel_vertices``
+  y ``create_angle_arc`` (cuadros/s),
+* ``render``: dibujo de cuadros de la animación en Agg (cuadros/s),
+* ``report``: reporte paginado codificado como PDF en memoria (reportes/s),
+* ``aggregate``: resumen por hora con percentiles (muestras/s).
+
+Cada caso se repite y se guarda el mejor tiempo por ejecución; la memoria
+pico se mide en una ejecución aparte con ``tracemalloc`` para no afectar al
+tiempo. Los resultados se escriben en JSON y se pueden comparar con una
+línea base guardada: el programa termina con código 1 si algún caso pierde
+más de la tolerancia de rendimiento.
+
+Uso::
+
+    python benchmark.py --intervalos 1 5 15 --duraciones 12 --sitios 1 8 \\
+        --guardar base.json
+    python benchmark.py --intervalos 1 5 15 --duraciones 12 --sitios 1 8 \\
+        --comparar base.json
+"""
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import date as date_type, datetime, timezone as dt_timezone
+
+import numpy as np
+
+from simulacion import QUITO, Site, simulate_day
+
+BENCHMARK_DATE = date_type(2024, 3, 21)
+DEFAULT_REPEATS = 3
+DEFAULT_TOLERANCE = 0.15
+# Cada repetición ejecuta el caso las veces necesarias para durar al menos
+# esto, así los casos muy rápidos no quedan dominados por el ruido
+MIN_SECONDS = 0.2
+# Cuadros dibujados en el caso ``render`` (dibujar un día completo a un
+# minuto alargaría mucho la suite sin cambiar el resultado)
+RENDER_FRAMES = 120
+
+CASES = ('ephemeris', 'geometry', 'geometry_scalar', 'render', 'report', 'aggregate')
+
+
+def benchmark_sites(count):
+    """Quito y, si se piden más, sitios sintéticos repartidos en latitud y longitud"""
+    if count <= 1:
+        return [QUITO]
+    latitudes = np.linspace(-60, 60, count - 1)
+    longitudes = np.linspace(-180, 180, count - 1, endpoint=False)
+    return [QUITO] + [Site(f"Sitio {i}", float(lat), float(lon), "UTC")
+                      for i, (lat, lon) in enumerate(zip(latitudes, longitudes), 1)]
+
+
+def _hour_start(duration):
+    # Las ventanas cortas empiezan a las 6:00 como en la interfaz
+    return 6 if duration <= 18 else 0
+
+
+def _table(interval, duration):
+    return simulate_day(BENCHMARK_DATE, _hour_start(duration), duration, interval)
+
+
+def _case_ephemeris(interval, duration, sites):
+    site_list = benchmark_sites(sites)
+
+    def run():
+        return sum(len(simulate_day(BENCHMARK_DATE, _hour_start(duration), duration, interval,
+                                    site)['time'])
+                   for site in site_list)
+    return run, 'samples/s'
+
+
+def _case_geometry(interval, duration, sites):
+    from escena import precompute_geometry
+    table = _table(interval, duration)
+
+    def run():
+        precompute_geometry(table['sun_vector'], table['elevation'], table['azimuth'])
+        return len(table['time'])
+    return run, 'frames/s'
+
+
+def _case_geometry_scalar(interval, duration, sites):
+    from escena import create_angle_arc, create_panel_vertices
+    table = _table(interval, duration)
+    north = np.array([0.0, 1.0, 0.0])
+
+    def run():
+        for vector in table['sun_vector']:
+            horizontal = np.array([vector[0], vector[1], 0.0])
+            create_panel_vertices(vector)
+            create_angle_arc(horizontal, vector)
+            create_angle_arc(north, horizontal)
+        return len(table['time'])
+    return run, 'frames/s'
+
+
+def _case_render(interval, duration, sites):
+    from exportar import render_frames
+    table = _table(interval, duration)
+    frames = min(RENDER_FRAMES, len(table['time']))
+
+    def run():
+        for _ in render_frames(table, 0, frames):
+            pass
+        return frames
+    return run, 'frames/s'
+
+
+def _case_report(interval, duration, sites):
+    from reporte import config_lines, render_report
+    from simulacion import TrackingStats
+    table = _table(interval, duration)
+    lines = config_lines(QUITO, BENCHMARK_DATE, _hour_start(duration), duration, interval,
+                         len(table['time']))
+    summary = TrackingStats().update(table).summary()
+
+    def run():
+        pages = render_report(lines, table, summary)
+        pages[0].save(io.BytesIO(), 'PDF', save_all=True, append_images=pages[1:])
+        return 1
+    return run, 'reports/s'
+
+
+def _case_aggregate(interval, duration, sites):
+    from agregacion import aggregate
+    table = _table(interval, duration)
+
+    def run():
+        aggregate(table, 'hour', percentiles=(5, 50, 95))
+        return len(table['time'])
+    return run, 'samples/s'
+
+
+_FACTORIES = {
+    'ephemeris': _case_ephemeris,
+    'geometry': _case_geometry,
+    'geometry_scalar': _case_geometry_scalar,
+    'render': _case_render,
+    'report': _case_report,
+    'aggregate': _case_aggregate,
+}
+
+
+def run_case(name, interval, duration, sites, repeats=DEFAULT_REPEATS):
+    """Ejecuta un caso y devuelve su resultado como diccionario"""
+    run, unit = _FACTORIES[name](interval, duration, sites)
+    run()  # calentamiento: importaciones, cachés de fuentes, etc.
+    best = np.inf
+    for _ in range(repeats):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            work = run()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= MIN_SECONDS:
+                break
+        best = min(best, elapsed / calls)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'case': name,
+        'params': {'interval': interval, 'duration': duration, 'sites': sites},
+        'seconds': best,
+        'work': work,
+        'throughput': work / best if best > 0 else float('inf'),
+        'unit': unit,
+        'peak_bytes': peak,
+    }
+
+
+def run_suite(cases=CASES, intervals=(15,), durations=(12,), site_counts=(1,),
+              repeats=DEFAULT_REPEATS, progress=None):
+    """Ejecuta los casos sobre la rejilla de parámetros.
+
+    Solo ``ephemeris`` depende del número de sitios; los demás casos se
+    miden una vez por (intervalo, duración).
+    """
+    results = []
+    for name in cases:
+        for interval in intervals:
+            for duration in durations:
+                for sites in (site_counts if name == 'ephemeris' else site_counts[:1]):
+                    result = run_case(name, interval, duration, sites, repeats)
+                    if progress is not None:
+                        progress(result)
+                    results.append(result)
+    return {'meta': environment(), 'results': results}
+
+
+def environment():
+    import matplotlib
+    return {
+        'created': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def _key(result):
+    params = result['params']
+    return result['case'], params['interval'], params['duration'], params['sites']
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compara con una línea base; devuelve (filas, hay_regresiones).
+
+    Cada fila es (caso, parámetros, rendimiento base, actual, cociente). Hay
+    regresión si el cociente actual/base cae por debajo de ``1 - tolerance``.
+    """
+    base = {_key(r): r for r in baseline['results']}
+    rows = []
+    regressed = False
+    for result in current['results']:
+        reference = base.get(_key(result))
+        if reference is None:
+            continue
+        ratio = result['throughput'] / reference['throughput']
+        regressed |= ratio < 1 - tolerance
+        rows.append((result['case'], result['params'], reference['throughput'],
+                     result['throughput'], ratio))
+    return rows, regressed
+
+
+def _describe(result):
+    p = result['params']
+    return (f"{result['case']:<16} intervalo={p['interval']:>3} min  duracion={p['duration']:>2} h  "
+            f"sitios={p['sites']:>3}  {result['throughput']:>12.1f} {result['unit']:<10} "
+            f"pico={result['peak_bytes'] / 2**20:7.1f} MiB")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento sin pantalla")
+    parser.add_argument('--casos', nargs='+', choices=CASES, default=list(CASES),
+                        help="casos a medir (por defecto, todos)")
+    parser.add_argument('--intervalos', type=int, nargs='+', default=[15],
+                        help="intervalos en minutos")
+    parser.add_argument('--duraciones', type=int, nargs='+', default=[12],
+                        help="duraciones de la ventana en horas")
+    parser.add_argument('--sitios', type=int, nargs='+', default=[1],
+                        help="número de sitios para el caso ephemeris")
+    parser.add_argument('--repeticiones', type=int, default=DEFAULT_REPEATS,
+                        help="repeticiones por caso (se guarda la mejor)")
+    parser.add_argument('--guardar', default=None, help="archivo JSON de resultados")
+    parser.add_argument('--comparar', default=None, help="línea base JSON con la que comparar")
+    parser.add_argument('--tolerancia', type=float, default=DEFAULT_TOLERANCE,
+                        help="pérdida de rendimiento tolerada (fracción, por defecto 0.15)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if min(args.intervalos + args.duraciones + args.sitios) <= 0 or args.repeticiones <= 0:
+        print("Error: los parámetros deben ser positivos", file=sys.stderr)
+        return 2
+    baseline = None
+    if args.comparar:
+        try:
+            with open(args.comparar, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: no se pudo leer la línea base: {e}", file=sys.stderr)
+            return 2
+
+    results = run_suite(args.casos, args.intervalos, args.duraciones, args.sitios,
+                        args.repeticiones, progress=lambda r: print(_describe(r), flush=True))
+    if args.guardar:
+        with open(args.guardar, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is None:
+        return 0
+    rows, regressed = compare(results, baseline, args.tolerancia)
+    print()
+    for case, params, before, after, ratio in rows:
+        flag = "  REGRESION" if ratio < 1 - args.tolerancia else ""
+        print(f"{case:<16} {params}  {before:12.1f} -> {after:12.1f}  ({ratio:5.2f}x){flag}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
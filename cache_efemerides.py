@@ -0,0 +1,189 @@
+"""Caché persistente de efemérides solares.
+
+La posición del sol para un sitio e instante no cambia, así que se guarda
+por "mosaicos": un día UTC completo de muestras con un paso y una fase
+dados, identificado por (latitud, longitud, día, paso, fase, versión del
+algoritmo). Una ventana cualquiera (fecha, hora de inicio, duración,
+intervalo) se arma a partir de los mosaicos que cubre, así que repetir una
+simulación, extenderla a más días o pedir una ventana que se solapa con
+otra ya calculada sobre la misma rejilla de muestras no vuelve a calcular
+nada.
+
+Hay dos niveles: un LRU en memoria y un directorio en disco con límite de
+tamaño, donde se eliminan primero los archivos usados hace más tiempo.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from efemerides import ALGORITHM_VERSION, sun_position
+
+SECONDS_PER_DAY = 86400
+
+DEFAULT_DIRECTORY = os.environ.get(
+    'SEGUIDOR_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'seguidor_solar'))
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class EphemerisCache:
+    """Caché de dos niveles (memoria LRU + disco acotado) de elevación/azimuth.
+
+    ``directory=None`` desactiva el nivel en disco. Si el directorio no se
+    puede escribir, la caché sigue funcionando solo en memoria. Se puede
+    compartir entre hilos.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, memory_entries=DEFAULT_MEMORY_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._disk_bytes = None
+        self._lock = threading.RLock()
+        if directory is not None:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError:
+                self.directory = None
+
+    @staticmethod
+    def tile_key(site, day, step, phase):
+        raw = (f"{site.latitude:.7f}|{site.longitude:.7f}|{day}|{step}|{phase}|"
+               f"{ALGORITHM_VERSION}")
+        return hashlib.sha1(raw.encode('ascii')).hexdigest()
+
+    @staticmethod
+    def tile_times(day, step, phase):
+        """Instantes (segundos Unix) del mosaico del día UTC ``day``"""
+        day_start = day * SECONDS_PER_DAY
+        first = day_start + (phase - day_start) % step
+        return np.arange(first, day_start + SECONDS_PER_DAY, step, dtype=np.int64)
+
+    def tile(self, site, day, step, phase):
+        """Devuelve un arreglo (2, n) con elevación y azimuth del mosaico"""
+        with self._lock:
+            return self._tile(site, day, step, phase)
+
+    def _tile(self, site, day, step, phase):
+        key = self.tile_key(site, day, step, phase)
+        values = self._memory.get(key)
+        if values is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return values
+
+        values = self._read_disk(key)
+        if values is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            values = np.array(sun_position(self.tile_times(day, step, phase),
+                                           site.latitude, site.longitude))
+            self._write_disk(key, values)
+
+        self._memory[key] = values
+        if len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+        return values
+
+    def window(self, site, start, count, step):
+        """Elevación y azimuth de ``count`` muestras desde ``start``.
+
+        ``start`` está en segundos Unix y ``step`` en segundos.
+        """
+        start, step = int(start), int(step)
+        elevations = np.empty(count)
+        azimuths = np.empty(count)
+        if count == 0:
+            return elevations, azimuths
+        phase = start % step
+        end = start + (count - 1) * step
+        for day in range(start // SECONDS_PER_DAY, end // SECONDS_PER_DAY + 1):
+            times = self.tile_times(day, step, phase)
+            i0 = np.searchsorted(times, start)
+            i1 = np.searchsorted(times, end, side='right')
+            if i1 <= i0:
+                continue
+            j0 = (int(times[i0]) - start) // step
+            values = self.tile(site, day, step, phase)
+            elevations[j0:j0 + i1 - i0] = values[0, i0:i1]
+            azimuths[j0:j0 + i1 - i0] = values[1, i0:i1]
+        return elevations, azimuths
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    # --- Nivel en disco ---
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def _read_disk(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            values = np.load(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return values
+
+    def _write_disk(self, key, values):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            previous = os.path.getsize(path)  # al reemplazar un mosaico no crece el total
+        except OSError:
+            previous = 0
+        try:
+            with open(tmp, 'wb') as f:
+                np.save(f, values)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        if self._disk_bytes is None:
+            self._disk_bytes = self._scan_size()
+        else:
+            self._disk_bytes += os.path.getsize(path) - previous
+        if self._disk_bytes > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Elimina los mosaicos usados hace más tiempo hasta volver al límite"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
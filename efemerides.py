@@ -0,0 +1,121 @@
+"""Motor vectorizado de posición solar.
+
+Calcula elevación y azimuth para arreglos completos de instantes en una sola
+pasada de NumPy, en lugar de llamar a pysolar muestra por muestra. Se usa el
+algoritmo de baja precisión de Meeus (cap. 25) con tiempo sidéreo aparente,
+paralaje topocéntrica y la misma corrección de refracción del NREL SPA que
+aplica pysolar.
+
+Frente a ``pysolar.solar.get_altitude``/``get_azimuth`` el error angular
+entre ambos vectores solares se mantiene por debajo de ``TOLERANCE_DEG``
+(en elevación y en distancia angular) para fechas entre 1950 y 2100 con el
+sol sobre el horizonte. Un año completo a resolución de un minuto
+(~525 600 muestras) se calcula en una fracción de segundo.
+"""
+from datetime import datetime
+
+import numpy as np
+
+# Se incrementa cuando cambia el resultado numérico del algoritmo
+ALGORITHM_VERSION = "meeus-1"
+
+# Diferencia máxima esperada contra pysolar (grados)
+TOLERANCE_DEG = 0.025
+
+# Valores estándar usados por pysolar (Pa, K)
+STANDARD_PRESSURE = 101325.0
+STANDARD_TEMPERATURE = 288.15
+
+_J2000_EPOCH_S = 946728000.0  # 2000-01-01T12:00:00Z en segundos Unix
+_SOLAR_PARALLAX = 8.794 / 3600.0
+_SUN_RADIUS = 0.26667
+_ATMOS_REFRACT = 0.5667
+
+
+def to_epoch_seconds(times):
+    """Convierte instantes a segundos Unix (UTC) como float64.
+
+    Acepta arreglos ``datetime64`` (interpretados como UTC), números ya en
+    segundos Unix o secuencias de ``datetime`` con zona horaria.
+    """
+    if isinstance(times, datetime):
+        times = [times]
+    arr = np.asarray(times)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype('datetime64[ns]').astype(np.int64) / 1e9
+    if arr.dtype == object:
+        return np.array([t.timestamp() for t in arr.ravel()],
+                        dtype=np.float64).reshape(arr.shape)
+    return arr.astype(np.float64)
+
+
+def refraction_correction(elevation, pressure=STANDARD_PRESSURE,
+                          temperature=STANDARD_TEMPERATURE):
+    """Corrección de refracción atmosférica del NREL SPA (grados)"""
+    e = np.asarray(elevation, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correction = (pressure * 2.830 * 1.02) / (
+            1010.0 * temperature * 60.0 * np.tan(np.radians(e + 10.3 / (e + 5.11))))
+    return np.where(e >= -(_SUN_RADIUS + _ATMOS_REFRACT), correction, 0.0)
+
+
+def sun_position(times, latitude, longitude, refraction=True,
+                 pressure=STANDARD_PRESSURE, temperature=STANDARD_TEMPERATURE):
+    """Calcula elevación y azimuth solares (grados) de forma vectorizada.
+
+    ``latitude`` y ``longitude`` se combinan con ``times`` siguiendo las
+    reglas de broadcasting de NumPy, así que un arreglo de sitios con forma
+    ``(n_sitios, 1)`` y tiempos ``(n_tiempos,)`` produce ``(n_sitios, n_tiempos)``.
+    El azimuth se mide desde el norte en sentido horario (0-360), igual que pysolar.
+    """
+    d = (to_epoch_seconds(times) - _J2000_EPOCH_S) / 86400.0
+    T = d / 36525.0
+
+    # Coordenadas eclípticas del sol
+    L0 = 280.46646 + T * (36000.76983 + T * 0.0003032)
+    M = np.radians(357.52911 + T * (35999.05029 - 0.0001537 * T))
+    C = (np.sin(M) * (1.914602 - T * (0.004817 + 0.000014 * T))
+         + np.sin(2 * M) * (0.019993 - 0.000101 * T)
+         + np.sin(3 * M) * 0.000289)
+    omega = np.radians(125.04 - 1934.136 * T)
+    apparent_long = np.radians(L0 + C - 0.00569 - 0.00478 * np.sin(omega))
+
+    # Oblicuidad corregida y coordenadas ecuatoriales
+    eps0 = 23.0 + (26.0 + (21.448 - T * (46.815 + T * (0.00059 - T * 0.001813))) / 60.0) / 60.0
+    eps = np.radians(eps0 + 0.00256 * np.cos(omega))
+    right_ascension = np.degrees(np.arctan2(np.cos(eps) * np.sin(apparent_long),
+                                            np.cos(apparent_long)))
+    declination = np.arcsin(np.sin(eps) * np.sin(apparent_long))
+
+    # Tiempo sidéreo aparente en Greenwich (con nutación en longitud)
+    nutation_long = -0.00478 * np.sin(omega)
+    gmst = (280.46061837 + 360.98564736629 * d
+            + T * T * (0.000387933 - T / 38710000.0))
+    gast = gmst + nutation_long * np.cos(eps)
+
+    hour_angle = np.radians((gast + longitude - right_ascension) % 360.0)
+    lat = np.radians(latitude)
+
+    elevation = np.degrees(np.arcsin(
+        np.sin(lat) * np.sin(declination)
+        + np.cos(lat) * np.cos(declination) * np.cos(hour_angle)))
+    # Paralaje topocéntrica (8.794" a 1 UA)
+    elevation = elevation - _SOLAR_PARALLAX * np.cos(np.radians(elevation))
+    azimuth = (180.0 + np.degrees(np.arctan2(
+        np.sin(hour_angle),
+        np.cos(hour_angle) * np.sin(lat) - np.tan(declination) * np.cos(lat)))) % 360.0
+
+    if refraction:
+        elevation = elevation + refraction_correction(elevation, pressure, temperature)
+    return elevation, azimuth
+
+
+def sun_vectors(elevations, azimuths):
+    """Vectores unitarios hacia el sol (x=Este, y=Norte, z=Altura)"""
+    elev_rad = np.radians(elevations)
+    azim_rad = np.radians(azimuths)
+    return np.stack([
+        np.cos(elev_rad) * np.sin(azim_rad),
+        np.cos(elev_rad) * np.cos(azim_rad),
+        np.sin(elev_rad)
+    ], axis=-1)
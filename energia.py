@@ -0,0 +1,156 @@
+"""Rendimiento energético del seguidor frente a montajes de referencia.
+
+Calcula, de forma vectorizada sobre los vectores solares de la simulación,
+la irradiancia en el plano del panel (POA) con cielo despejado y la integra
+en el tiempo para obtener kWh/m² de:
+
+* el seguidor de 2 grados de libertad (panel normal al vector solar),
+* un seguidor de un eje horizontal norte-sur (rota de este a oeste),
+* un panel fijo inclinado hacia el ecuador.
+
+Modelo de cielo despejado: irradiancia directa normal de Laue (Meinel
+corregido por altitud) con masa de aire de Kasten-Young, difusa como el
+10 % de la directa y reflejo del suelo isotrópico. Las pérdidas por ángulo
+de incidencia usan el modelo ASHRAE. Es un modelo simple y barato, pensado
+para comparar montajes a lo largo de años y muchos sitios, no para
+predecir la producción de una planta real.
+"""
+import numpy as np
+
+from simulacion import series_breaks
+
+SOLAR_CONSTANT = 1361.0  # W/m²
+DIFFUSE_FRACTION = 0.1
+DEFAULT_ALBEDO = 0.2
+ASHRAE_B0 = 0.05
+SINGLE_AXIS_LIMIT = 60.0  # grados
+
+MOUNTS = ('dual_axis', 'single_axis', 'fixed_tilt')
+MOUNT_LABELS = {
+    'dual_axis': "Seguidor 2-DOF",
+    'single_axis': "Seguidor 1 eje",
+    'fixed_tilt': "Panel fijo",
+}
+
+
+def air_mass(elevations):
+    """Masa de aire relativa de Kasten-Young (NaN con el sol bajo el horizonte)"""
+    e = np.asarray(elevations, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        am = 1.0 / (np.sin(np.radians(e)) + 0.50572 * (e + 6.07995) ** -1.6364)
+    return np.where(e > 0, am, np.nan)
+
+
+def clear_sky(times, elevations, altitude_m=0.0):
+    """Irradiancias de cielo despejado (DNI, DHI, GHI) en W/m²"""
+    day_of_year = (np.asarray(times, dtype='datetime64[D]')
+                   - np.asarray(times, dtype='datetime64[Y]')).astype(np.float64)
+    extraterrestrial = SOLAR_CONSTANT * (1 + 0.033 * np.cos(2 * np.pi * day_of_year / 365.0))
+    h = altitude_m / 1000.0
+    am = air_mass(elevations)
+    with np.errstate(invalid='ignore'):
+        dni = extraterrestrial * ((1 - 0.14 * h) * 0.7 ** (am ** 0.678) + 0.14 * h)
+    dni = np.nan_to_num(dni, nan=0.0)
+    dhi = DIFFUSE_FRACTION * dni
+    ghi = dni * np.clip(np.sin(np.radians(elevations)), 0, None) + dhi
+    return dni, dhi, ghi
+
+
+def incidence_modifier(cos_aoi, b0=ASHRAE_B0):
+    """Modificador por ángulo de incidencia ASHRAE (0 detrás del panel)"""
+    with np.errstate(divide='ignore'):
+        iam = 1 - b0 * (1 / cos_aoi - 1)
+    return np.where(cos_aoi > 0, np.clip(iam, 0, 1), 0.0)
+
+
+def plane_of_array(normals, sun_vectors, dni, dhi, ghi, albedo=DEFAULT_ALBEDO):
+    """Irradiancia en el plano del panel (W/m²) para normales (n, 3)"""
+    cos_aoi = np.einsum('ij,ij->i', normals, sun_vectors)
+    cos_tilt = normals[:, 2]
+    beam = dni * np.clip(cos_aoi, 0, None) * incidence_modifier(cos_aoi)
+    return beam + dhi * (1 + cos_tilt) / 2 + ghi * albedo * (1 - cos_tilt) / 2
+
+
+def mount_normals(sun_vectors, latitude, fixed_tilt=None, axis_limit=SINGLE_AXIS_LIMIT):
+    """Normales del panel para cada montaje.
+
+    El seguidor 2-DOF apunta al sol y queda horizontal de noche. El de un
+    eje rota alrededor del eje norte-sur hasta ``axis_limit``. El panel fijo
+    se inclina ``fixed_tilt`` grados (por defecto la latitud) hacia el ecuador.
+    """
+    sun_vectors = np.asarray(sun_vectors, dtype=np.float64)
+    up = np.array([0.0, 0.0, 1.0])
+    dual = np.where(sun_vectors[:, 2:3] > 0, sun_vectors, up)
+
+    rotation = np.radians(np.clip(np.degrees(np.arctan2(sun_vectors[:, 0], sun_vectors[:, 2])),
+                                  -axis_limit, axis_limit))
+    rotation = np.where(sun_vectors[:, 2] > 0, rotation, 0.0)
+    single = np.stack([np.sin(rotation), np.zeros_like(rotation), np.cos(rotation)], axis=-1)
+
+    tilt = np.radians(abs(latitude) if fixed_tilt is None else fixed_tilt)
+    toward_equator = 1.0 if latitude < 0 else -1.0  # +y es el norte
+    fixed = np.broadcast_to([0.0, toward_equator * np.sin(tilt), np.cos(tilt)], sun_vectors.shape)
+    return {'dual_axis': dual, 'single_axis': single, 'fixed_tilt': fixed}
+
+
+class EnergyYield:
+    """Integra la energía de cada montaje bloque a bloque (regla del trapecio).
+
+    Igual que ``simulacion.TrackingStats``, se alimenta con los bloques de la
+    simulación y no guarda las series completas. Los cortes de la serie (la
+    noche entre dos ventanas diarias, ver ``simulacion.series_breaks``) no se
+    integran.
+    """
+
+    def __init__(self, latitude, altitude_m=0.0, fixed_tilt=None,
+                 axis_limit=SINGLE_AXIS_LIMIT, albedo=DEFAULT_ALBEDO):
+        self.latitude = latitude
+        self.altitude_m = altitude_m
+        self.fixed_tilt = fixed_tilt
+        self.axis_limit = axis_limit
+        self.albedo = albedo
+        self.energy = dict.fromkeys(MOUNTS, 0.0)  # Wh/m²
+        self._last = None
+        self._typical_gap = None
+
+    def irradiance(self, chunk):
+        """Irradiancia POA (W/m²) de cada montaje para un bloque"""
+        sun_vectors = np.asarray(chunk['sun_vector'])
+        dni, dhi, ghi = clear_sky(chunk['time'], chunk['elevation'], self.altitude_m)
+        normals = mount_normals(sun_vectors, self.latitude, self.fixed_tilt, self.axis_limit)
+        return {mount: plane_of_array(normals[mount], sun_vectors, dni, dhi, ghi, self.albedo)
+                for mount in MOUNTS}
+
+    def update(self, chunk):
+        if len(chunk['time']) == 0:
+            return self
+        seconds = np.asarray(chunk['time'], dtype='datetime64[s]').astype(np.int64)
+        poa = self.irradiance(chunk)
+        if len(seconds) > 1:
+            self._typical_gap = float(np.median(np.diff(seconds)))
+        if self._last is not None:
+            # Une el último punto del bloque anterior con el primero de este
+            last_seconds, last_poa = self._last
+            seconds = np.concatenate([[last_seconds], seconds])
+            poa = {m: np.concatenate([[last_poa[m]], poa[m]]) for m in MOUNTS}
+        gaps = np.diff(seconds).astype(np.float64)
+        hours = np.where(series_breaks(gaps, self._typical_gap), 0.0, gaps / 3600.0)
+        for mount in MOUNTS:
+            self.energy[mount] += float(hours @ ((poa[mount][:-1] + poa[mount][1:]) / 2))
+        self._last = (seconds[-1], {m: poa[m][-1] for m in MOUNTS})
+        return self
+
+    def kwh_per_m2(self):
+        return {mount: wh / 1000.0 for mount, wh in self.energy.items()}
+
+    def summary(self):
+        """Líneas de resumen con el formato del reporte"""
+        kwh = self.kwh_per_m2()
+        reference = kwh['fixed_tilt']
+        lines = []
+        for mount in MOUNTS:
+            line = f"• Energia {MOUNT_LABELS[mount]}: {kwh[mount]:.2f} kWh/m²"
+            if mount != 'fixed_tilt' and reference > 0:
+                line += f" ({(kwh[mount] / reference - 1) * 100:+.1f}% vs fijo)"
+            lines.append(line)
+        return lines
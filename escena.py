@@ -0,0 +1,416 @@
+"""Escena 3D del seguidor solar.
+
+Dibuja la trayectoria solar, el panel, el vector solar y los arcos de
+elevación/azimuth sobre un ``Axes3D`` de matplotlib. Solo depende de
+matplotlib, así que la usan tanto la GUI como las exportaciones sin
+pantalla.
+
+Todos los artistas se crean una vez en ``build``; cada cuadro solo cambia
+sus datos. Los artistas que cambian son "animados": el dibujo completo de
+la figura los omite, se guarda el fondo estático y cada cuadro restaura ese
+fondo, dibuja solo los artistas animados y hace ``blit`` de la figura.
+
+La geometría de todos los cuadros (panel, flecha, arcos y posiciones de las
+etiquetas) depende solo de los vectores solares, así que se precalcula en
+una pasada vectorizada (``precompute_geometry``) y reproducir, adelantar o
+mover el deslizador solo indexa esos arreglos.
+
+La trayectoria completa forma parte del fondo y se dibuja con nivel de
+detalle (``path_level_of_detail``): simplificada con Douglas-Peucker sobre la
+esfera y con marcadores separados según el tamaño del píxel, así que volver
+a dibujar el fondo no crece con el número de muestras.
+"""
+from collections import namedtuple
+
+import numpy as np
+from mpl_toolkits.mplot3d import art3d
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+PANEL_WIDTH = 0.5
+PANEL_HEIGHT = 0.8
+SUN_DISTANCE = 1.0
+REFERENCE_VECTOR = np.array([0, 1, 0])
+
+# Vector solar dibujado como flecha (longitud y proporción de la punta)
+ARROW_LENGTH = 1.2
+ARROW_HEAD_RATIO = 0.1
+
+# Puntos por arco de ángulo
+ARC_POINTS = 15
+
+# Nivel de detalle de la trayectoria: error máximo de la línea simplificada y
+# separación mínima entre marcadores, en píxeles de pantalla
+PATH_TOLERANCE_PX = 1.0
+MARKER_SPACING_PX = 6.0
+
+# Niveles de detalle de la trayectoria guardados (uno por tamaño y zoom vistos)
+PATH_CACHE_SIZE = 8
+
+
+def create_panel_vertices(normal_vector, width=PANEL_WIDTH, height=PANEL_HEIGHT,
+                          reference_vector=REFERENCE_VECTOR):
+    normal = normal_vector / np.linalg.norm(normal_vector)
+    if np.allclose(np.abs(normal), [0, 0, 1]):
+        u = np.array([1, 0, 0])
+    else:
+        u = np.cross(reference_vector, normal)
+        u = u / np.linalg.norm(u)
+    v = np.cross(normal, u)
+    v = v / np.linalg.norm(v)
+    hw = width / 2
+    hh = height / 2
+    return [[hh * u + hw * v, -hh * u + hw * v, -hh * u - hw * v, hh * u - hw * v]]
+
+
+def create_angle_arc(start_vec, end_vec, center=np.array([0, 0, 0]), radius=0.3, num_points=20):
+    start_vec = start_vec / np.linalg.norm(start_vec)
+    end_vec = end_vec / np.linalg.norm(end_vec)
+    normal = np.cross(start_vec, end_vec)
+    if np.linalg.norm(normal) == 0:
+        normal = np.array([0, 0, 1])
+    else:
+        normal = normal / np.linalg.norm(normal)
+    u = start_vec
+    v = np.cross(normal, u)
+    v = v / np.linalg.norm(v)
+    angle_start = 0
+    angle_end = np.arccos(np.clip(np.dot(start_vec, end_vec), -1.0, 1.0))
+    angles = np.linspace(angle_start, angle_end, num_points)
+    arc = np.array([center + radius * (np.cos(a) * u + np.sin(a) * v) for a in angles])
+    return arc
+
+
+SceneGeometry = namedtuple('SceneGeometry', [
+    'panels',             # (cuadros, 4, 3) vértices del panel
+    'arrows',             # (cuadros, 3, 2, 3) segmentos de la flecha solar
+    'elevation_arcs',     # (cuadros, puntos, 3)
+    'azimuth_arcs',       # (cuadros, puntos, 3)
+    'elevation_labels',   # (cuadros, 3) punto medio del arco de elevación
+    'azimuth_labels',     # (cuadros, 3) punto medio del arco de azimuth
+    'elevation_visible',  # (cuadros,) bool
+    'azimuth_visible',    # (cuadros,) bool
+])
+
+
+def _normalize(vectors):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def panel_vertices_batch(normals, width=PANEL_WIDTH, height=PANEL_HEIGHT,
+                         reference_vector=REFERENCE_VECTOR):
+    """Versión vectorizada de ``create_panel_vertices`` para (cuadros, 3) normales"""
+    normal = _normalize(np.asarray(normals, dtype=np.float64))
+    vertical = np.all(np.isclose(np.abs(normal), [0, 0, 1]), axis=-1)
+    u = _normalize(np.cross(reference_vector, normal))
+    u[vertical] = [1, 0, 0]
+    v = _normalize(np.cross(normal, u))
+    hu = (height / 2) * u
+    hv = (width / 2) * v
+    return np.stack([hu + hv, -hu + hv, -hu - hv, hu - hv], axis=1)
+
+
+def angle_arcs_batch(start_vecs, end_vecs, radius=0.3, num_points=ARC_POINTS):
+    """Versión vectorizada de ``create_angle_arc``: devuelve (cuadros, puntos, 3)"""
+    start = _normalize(np.asarray(start_vecs, dtype=np.float64))
+    end = _normalize(np.asarray(end_vecs, dtype=np.float64))
+    normal = np.cross(start, end)
+    degenerate = np.linalg.norm(normal, axis=-1) == 0
+    normal = _normalize(normal)
+    normal[degenerate] = [0, 0, 1]
+    v = _normalize(np.cross(normal, start))
+    angle_end = np.arccos(np.clip(np.einsum('ij,ij->i', start, end), -1.0, 1.0))
+    angles = angle_end[:, None] * np.linspace(0, 1, num_points)[None, :]
+    return radius * (np.cos(angles)[..., None] * start[:, None, :]
+                     + np.sin(angles)[..., None] * v[:, None, :])
+
+
+def arrow_segments_batch(directions, length=ARROW_LENGTH, head_ratio=ARROW_HEAD_RATIO):
+    """Segmentos (cuerpo y dos trazos de punta) de flechas desde el origen: (cuadros, 3, 2, 3)"""
+    directions = np.asarray(directions, dtype=np.float64)
+    tip = directions * length
+    side = np.cross(directions, np.cross([0.0, 0.0, 1.0], directions))
+    flat = np.linalg.norm(side, axis=-1) < 1e-9
+    side = _normalize(side)
+    side[flat] = [1.0, 0.0, 0.0]
+    head = length * head_ratio
+    back = tip - head * np.cos(np.radians(15)) * directions
+    offset = head * np.sin(np.radians(15)) * side
+    origin = np.zeros_like(tip)
+    return np.stack([np.stack([origin, tip], axis=1),
+                     np.stack([tip, back + offset], axis=1),
+                     np.stack([tip, back - offset], axis=1)], axis=1)
+
+
+def precompute_geometry(sun_vectors, elevations, azimuths, panel_width=PANEL_WIDTH,
+                        panel_height=PANEL_HEIGHT, num_points=ARC_POINTS):
+    """Calcula la geometría de todos los cuadros en arreglos contiguos"""
+    sun_vectors = np.asarray(sun_vectors, dtype=np.float64)
+    elevations = np.asarray(elevations)
+    azimuths = np.asarray(azimuths)
+    horizontal = sun_vectors * [1.0, 1.0, 0.0]
+    has_horizontal = np.linalg.norm(horizontal, axis=-1) > 0.01
+    north = np.broadcast_to([0.0, 1.0, 0.0], sun_vectors.shape)
+    elevation_arcs = angle_arcs_batch(horizontal, sun_vectors, 0.3, num_points)
+    azimuth_arcs = angle_arcs_batch(north, horizontal, 0.2, num_points)
+    return SceneGeometry(
+        panels=panel_vertices_batch(sun_vectors, panel_width, panel_height),
+        arrows=arrow_segments_batch(sun_vectors),
+        elevation_arcs=elevation_arcs,
+        azimuth_arcs=azimuth_arcs,
+        elevation_labels=np.ascontiguousarray(elevation_arcs[:, num_points // 2]),
+        azimuth_labels=np.ascontiguousarray(azimuth_arcs[:, num_points // 2]),
+        elevation_visible=has_horizontal & (elevations > 5),
+        azimuth_visible=has_horizontal & (np.abs(azimuths) > 5),
+    )
+
+
+def simplify_path(vectors, tolerance):
+    """Índices que conserva Douglas-Peucker sobre la esfera unidad.
+
+    Un punto se descarta si su distancia angular (rad) al arco de círculo
+    máximo entre los puntos conservados vecinos no supera ``tolerance``.
+    """
+    unit = _normalize(np.asarray(vectors, dtype=np.float64))
+    n = len(unit)
+    if n <= 2:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    pending = [(0, n - 1)]
+    while pending:
+        first, last = pending.pop()
+        if last - first < 2:
+            continue
+        a, b = unit[first], unit[last]
+        inner = unit[first + 1:last]
+        to_ends = np.minimum(np.arccos(np.clip(inner @ a, -1.0, 1.0)),
+                             np.arccos(np.clip(inner @ b, -1.0, 1.0)))
+        normal = np.cross(a, b)
+        length = np.linalg.norm(normal)
+        if length < 1e-12:
+            distances = to_ends
+        else:
+            normal /= length
+            # Si la proyección cae fuera del arco cuenta el extremo más cercano
+            on_arc = (np.cross(a, inner) @ normal >= 0) & (np.cross(inner, b) @ normal >= 0)
+            to_circle = np.abs(np.arcsin(np.clip(inner @ normal, -1.0, 1.0)))
+            distances = np.where(on_arc, to_circle, to_ends)
+        worst = int(np.argmax(distances))
+        if distances[worst] > tolerance:
+            index = first + 1 + worst
+            keep[index] = True
+            pending += [(first, index), (index, last)]
+    return np.flatnonzero(keep)
+
+
+def spaced_indices(vectors, spacing):
+    """Primer punto de cada tramo de ``spacing`` rad recorridos sobre la trayectoria"""
+    unit = _normalize(np.asarray(vectors, dtype=np.float64))
+    if len(unit) == 0:
+        return np.arange(0)
+    steps = np.arccos(np.clip(np.einsum('ij,ij->i', unit[:-1], unit[1:]), -1.0, 1.0))
+    bins = np.floor(np.concatenate([[0.0], np.cumsum(steps)]) / spacing)
+    return np.flatnonzero(np.diff(bins, prepend=-1.0) != 0)
+
+
+def pixel_angle(ax, sun_distance=SUN_DISTANCE):
+    """Ángulo (rad) que ocupa aproximadamente un píxel sobre la trayectoria"""
+    bbox = ax.get_window_extent()
+    pixels = max(min(bbox.width, bbox.height), 1.0)
+    x_min, x_max = ax.get_xlim()
+    return (x_max - x_min) / pixels / sun_distance
+
+
+def path_level_of_detail(vectors, ax, sun_distance=SUN_DISTANCE):
+    """Puntos a dibujar de la trayectoria y posiciones de sus marcadores.
+
+    La línea conserva la forma con un error menor que ``PATH_TOLERANCE_PX``
+    y los marcadores quedan a ``MARKER_SPACING_PX`` o más entre sí, así que
+    el número de vértices depende del tamaño en pantalla y no del número de
+    muestras. Devuelve (puntos (m, 3), índices de los marcadores en ``puntos``).
+    """
+    vectors = np.asarray(vectors, dtype=np.float64)
+    pixel = pixel_angle(ax, sun_distance)
+    markers = spaced_indices(vectors, pixel * MARKER_SPACING_PX)
+    kept = np.union1d(simplify_path(vectors, pixel * PATH_TOLERANCE_PX), markers)
+    return vectors[kept] * sun_distance, np.searchsorted(kept, markers).tolist()
+
+
+class TrackerScene:
+    """Escena del seguidor sobre un ``Axes3D`` con artistas reutilizables"""
+
+    def __init__(self, ax, sun_vectors, elevations, azimuths, pitch_angles, roll_angles,
+                 time_labels, panel_width=PANEL_WIDTH, panel_height=PANEL_HEIGHT,
+                 sun_distance=SUN_DISTANCE):
+        self.ax = ax
+        self.fig = ax.figure
+        self.sun_vectors = sun_vectors
+        self.elevations = elevations
+        self.azimuths = azimuths
+        self.pitch_angles = pitch_angles
+        self.roll_angles = roll_angles
+        self.time_labels = time_labels
+        self.panel_width = panel_width
+        self.panel_height = panel_height
+        self.sun_distance = sun_distance
+        self.geometry = precompute_geometry(sun_vectors, elevations, azimuths,
+                                            panel_width, panel_height)
+        self.animated = []
+        self.background = None
+        self._draw_cid = None
+        self._path_cache = {}
+        self._path_key = None
+
+    def build(self):
+        """Crea todos los artistas de la escena y devuelve los animados"""
+        ax = self.ax
+        ax.set_xlim([-1.2, 1.2])
+        ax.set_ylim([-1.2, 1.2])
+        ax.set_zlim([0, 1.5])
+        # La trayectoria es parte del fondo: se dibuja simplificada a la
+        # resolución de la pantalla (ver update_path); las tablas y lecturas
+        # usan todas las muestras
+        self.path_line, = ax.plot([], [], [], 'y-', alpha=0.5, marker='o', markersize=3,
+                                  label="Trayectoria solar")
+        self.update_path()
+        ax.set_xlabel("Este-Oeste")
+        ax.set_ylabel("Norte-Sur")
+        ax.set_zlabel("Altura")
+
+        self.legend_text = ax.text2D(
+            0.05, 0.05,
+            "● = Elevacion (rojo)\n● = Azimuth (azul)",
+            transform=ax.transAxes, fontsize=9, color='black',
+            bbox=dict(facecolor='white', alpha=0.8, edgecolor='gray')
+        )
+        ax.legend()
+
+        # Artistas animados: se crean una sola vez y cada cuadro cambia sus datos
+        geometry = self.geometry
+        self.panel = Poly3DCollection(geometry.panels[:1], color='green', alpha=0.8)
+        ax.add_collection3d(self.panel)
+        self.sun_arrow = art3d.Line3DCollection(geometry.arrows[0], colors=['orange'])
+        ax.add_collection3d(self.sun_arrow)
+        self.sun_marker, = ax.plot([0], [0], [0], linestyle='', marker='o', markersize=14,
+                                   markerfacecolor='yellow', markeredgecolor='orange', zorder=10)
+        self.elevation_arc = art3d.Line3DCollection([], colors=['red'], linewidths=2)
+        ax.add_collection3d(self.elevation_arc)
+        self.azimuth_arc = art3d.Line3DCollection([], colors=['blue'], linewidths=2)
+        ax.add_collection3d(self.azimuth_arc)
+        self.elevation_angle_label = ax.text(0, 0, 0, "", fontsize=8, color='red',
+                                             ha='center', va='center')
+        self.azimuth_angle_label = ax.text(0, 0, 0, "", fontsize=8, color='blue',
+                                           ha='center', va='center')
+        self.angle_text = ax.text2D(
+            0.05, 0.95, "", transform=ax.transAxes, fontsize=10, verticalalignment='top',
+            bbox=dict(facecolor='white', alpha=0.8)
+        )
+
+        self.animated = [self.panel, self.sun_arrow, self.sun_marker,
+                         self.elevation_arc, self.azimuth_arc,
+                         self.elevation_angle_label, self.azimuth_angle_label,
+                         self.angle_text, ax.title]
+        for artist in self.animated:
+            artist.set_animated(True)
+
+        self._draw_cid = self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        return self.animated
+
+    def update_path(self):
+        """Ajusta el nivel de detalle de la trayectoria al tamaño y zoom actuales.
+
+        Se recalcula solo si cambió el tamaño en píxeles de los ejes o sus
+        límites; cada nivel se guarda por esa clave. Devuelve si la línea cambió.
+        """
+        bbox = self.ax.get_window_extent()
+        key = (round(bbox.width), round(bbox.height), *np.round(self.ax.get_xlim(), 9))
+        if key == self._path_key:
+            return False
+        detail = self._path_cache.get(key)
+        if detail is None:
+            detail = path_level_of_detail(self.sun_vectors, self.ax, self.sun_distance)
+            if len(self._path_cache) >= PATH_CACHE_SIZE:
+                self._path_cache.pop(next(iter(self._path_cache)))
+            self._path_cache[key] = detail
+        sun_path, markers = detail
+        self.path_line.set_data_3d(sun_path[:, 0], sun_path[:, 1], sun_path[:, 2])
+        self.path_line.set_markevery(markers)
+        self._path_key = key
+        return True
+
+    def update(self, frame):
+        """Actualiza los datos de los artistas animados para un cuadro"""
+        geometry = self.geometry
+        elevation = self.elevations[frame]
+        azimuth = self.azimuths[frame]
+
+        self.panel.set_verts(geometry.panels[frame:frame + 1])
+        self.sun_arrow.set_segments(geometry.arrows[frame])
+        sun = self.sun_vectors[frame] * self.sun_distance
+        self.sun_marker.set_data_3d([sun[0]], [sun[1]], [sun[2]])
+
+        # Arco de elevación (rojo)
+        show = bool(geometry.elevation_visible[frame])
+        if show:
+            self.elevation_arc.set_segments(geometry.elevation_arcs[frame:frame + 1])
+            self.elevation_angle_label.set_position_3d(geometry.elevation_labels[frame])
+            self.elevation_angle_label.set_text(f"{elevation:.1f}°")
+        self.elevation_arc.set_visible(show)
+        self.elevation_angle_label.set_visible(show)
+
+        # Arco de azimuth (azul)
+        show = bool(geometry.azimuth_visible[frame])
+        if show:
+            self.azimuth_arc.set_segments(geometry.azimuth_arcs[frame:frame + 1])
+            self.azimuth_angle_label.set_position_3d(geometry.azimuth_labels[frame])
+            self.azimuth_angle_label.set_text(f"{azimuth:.1f}°")
+        self.azimuth_arc.set_visible(show)
+        self.azimuth_angle_label.set_visible(show)
+
+        self.angle_text.set_text(
+            f"Elevacion: {elevation:.2f}°\n"
+            f"Azimuth: {azimuth:.2f}°\n"
+            f"Pitch: {self.pitch_angles[frame]:.2f}°\n"
+            f"Roll: {self.roll_angles[frame]:.2f}°"
+        )
+        self.ax.set_title(f"Posicion solar a las {self.time_labels[frame]}")
+        return self.animated
+
+    def render(self, frame):
+        """Actualiza y dibuja un cuadro, con blit si el lienzo lo permite"""
+        self.update(frame)
+        canvas = self.fig.canvas
+        if self.background is None or not canvas.supports_blit:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self.background)
+        self.draw_animated()
+        canvas.blit(self.fig.bbox)
+
+    def draw_animated(self):
+        for artist in self.animated:
+            if not artist.get_visible():
+                continue
+            if hasattr(artist, 'do_3d_projection'):
+                artist.do_3d_projection()
+            self.fig.draw_artist(artist)
+
+    def _on_draw(self, event):
+        # Tras un dibujo completo (inicio, rotación, cambio de tamaño) se
+        # guarda el fondo estático y se vuelven a dibujar los animados. Si el
+        # tamaño o el zoom cambiaron, la trayectoria de este dibujo quedó con
+        # otro nivel de detalle: se corrige y se pide otro dibujo
+        canvas = self.fig.canvas
+        if self.update_path():
+            self.background = None
+            canvas.draw_idle()
+            return
+        if canvas.supports_blit:
+            self.background = canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_animated()
+
+    def disconnect(self):
+        if self._draw_cid is not None:
+            self.fig.canvas.mpl_disconnect(self._draw_cid)
+            self._draw_cid = None
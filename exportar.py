@@ -0,0 +1,244 @@
+"""Exportación de la animación 3D sin pantalla a video o secuencias de cuadros.
+
+Usa la misma ``escena.TrackerScene`` que la interfaz, pero sobre un lienzo
+Agg fuera de pantalla: cada cuadro se dibuja con blit sobre el fondo estático
+y se lee directamente del búfer del lienzo.
+
+Cada clip (un día de un sitio) se divide en tramos de cuadros que se
+reparten entre procesos con ``ProcessPoolExecutor``; después los tramos se
+unen en orden:
+
+* ``.mp4``: cada tramo se codifica con ``ffmpeg`` y los segmentos se
+  concatenan sin recodificar (requiere el ejecutable ``ffmpeg``),
+* ``.gif``: los tramos escriben cuadros ya cuantizados a paleta en PNG
+  temporales que se unen con Pillow,
+* cualquier otra salida es un directorio con ``frame_00000.png``, ...
+
+Uso desde la línea de comandos (un clip por sitio y día)::
+
+    python exportar.py --fecha 2024-01-01 --hasta 2024-12-31 --intervalo 10 \\
+        --formato mp4 --procesos 8 --salida clips/
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date as date_type, timedelta
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from escena import TrackerScene
+
+ExportJob = namedtuple('ExportJob', ['table', 'output'])
+
+FIGSIZE = (12, 8)
+DEFAULT_DPI = 80
+DEFAULT_FPS = 5  # igual que la reproducción en la interfaz (200 ms por cuadro)
+
+# Cuadros por tarea; tramos más cortos reparten mejor la carga pero cada
+# tarea paga el costo de construir la figura
+FRAMES_PER_TASK = 120
+
+
+def output_format(output):
+    ext = os.path.splitext(output)[1].lower()
+    return {'.mp4': 'mp4', '.gif': 'gif'}.get(ext, 'png')
+
+
+def time_labels(table):
+    """Etiquetas de hora local; con segundos si la línea de tiempo los usa"""
+    local_times = np.asarray(table['local_time'], dtype='datetime64[s]')
+    unit = 's' if np.any(local_times.astype(np.int64) % 60) else 'm'
+    return [t[11:] for t in np.datetime_as_string(local_times, unit=unit)]
+
+
+def render_frames(table, start=0, stop=None, dpi=DEFAULT_DPI, figsize=FIGSIZE):
+    """Genera los cuadros ``start:stop`` de la animación como arreglos RGB (alto, ancho, 3)"""
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, projection='3d')
+    scene = TrackerScene(ax, np.asarray(table['sun_vector']), np.asarray(table['elevation']),
+                         np.asarray(table['azimuth']), np.asarray(table['pitch']),
+                         np.asarray(table['roll']), time_labels(table))
+    scene.build()
+    scene.update(start)
+    canvas.draw()  # guarda el fondo estático para el blit
+    stop = len(table['time']) if stop is None else stop
+    for frame in range(start, stop):
+        scene.render(frame)
+        yield np.asarray(canvas.buffer_rgba())[..., :3].copy()
+    scene.disconnect()
+
+
+def _ffmpeg():
+    path = shutil.which('ffmpeg')
+    if path is None:
+        raise ValueError("La exportación a MP4 necesita el ejecutable ffmpeg")
+    return path
+
+
+def _encode_mp4(frames, path, fps):
+    process = None
+    try:
+        for image in frames:
+            if process is None:
+                height, width = image.shape[:2]
+                process = subprocess.Popen(
+                    [_ffmpeg(), '-y', '-loglevel', 'error', '-f', 'rawvideo',
+                     '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+                     '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-c:v', 'libx264',
+                     '-pix_fmt', 'yuv420p', path],
+                    stdin=subprocess.PIPE)
+            process.stdin.write(image.tobytes())
+    finally:
+        if process is not None:
+            process.stdin.close()
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg falló al escribir {path}")
+
+
+def _render_task(task):
+    """Dibuja un tramo de un clip y lo escribe en ``target``"""
+    table, fmt, start, stop, target, fps, dpi = task
+    frames = render_frames(table, start, stop, dpi)
+    if fmt == 'mp4':
+        _encode_mp4(frames, target, fps)
+        return
+    from PIL import Image
+    for frame, image in enumerate(frames, start):
+        image = Image.fromarray(image)
+        if fmt == 'gif':
+            # La cuantización a paleta, lo más caro del GIF, se hace en paralelo
+            image = image.quantize(method=Image.Quantize.FASTOCTREE)
+        image.save(os.path.join(target, f"frame_{frame:05d}.png"), compress_level=1)
+
+
+def _stitch(fmt, output, segments, workdir, frame_count, fps):
+    if fmt == 'mp4':
+        listing = os.path.join(workdir, 'segments.txt')
+        with open(listing, 'w', encoding='utf-8') as f:
+            f.writelines(f"file '{os.path.abspath(path)}'\n" for path in segments)
+        subprocess.run([_ffmpeg(), '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                        '-i', listing, '-c', 'copy', output], check=True)
+    elif fmt == 'gif':
+        from PIL import Image
+        paths = [os.path.join(workdir, f"frame_{frame:05d}.png") for frame in range(frame_count)]
+        first = Image.open(paths[0])
+        first.save(output, save_all=True, append_images=(Image.open(p) for p in paths[1:]),
+                   duration=int(1000 / fps), loop=0)
+
+
+def export_clips(jobs, fps=DEFAULT_FPS, dpi=DEFAULT_DPI, max_workers=None,
+                 frames_per_task=FRAMES_PER_TASK):
+    """Exporta varios clips repartiendo sus tramos de cuadros entre procesos.
+
+    El formato de cada clip sale de la extensión de ``output`` (ver el
+    docstring del módulo). Con ``max_workers=1`` todo se dibuja en el
+    proceso actual. Devuelve la lista de salidas escritas.
+    """
+    with tempfile.TemporaryDirectory(prefix='seguidor_export_') as workdir:
+        tasks = []
+        clips = []
+        for index, job in enumerate(jobs):
+            fmt = output_format(job.output)
+            count = len(job.table['time'])
+            if count == 0:
+                raise ValueError(f"No hay cuadros para {job.output}")
+            if fmt == 'mp4':
+                _ffmpeg()
+            if fmt == 'png':
+                os.makedirs(job.output, exist_ok=True)
+            clip_dir = os.path.join(workdir, f"clip{index:05d}")
+            os.makedirs(clip_dir)
+            segments = []
+            for start in range(0, count, frames_per_task):
+                stop = min(start + frames_per_task, count)
+                if fmt == 'mp4':
+                    target = os.path.join(clip_dir, f"segment{start:05d}.mp4")
+                    segments.append(target)
+                else:
+                    target = job.output if fmt == 'png' else clip_dir
+                tasks.append((job.table, fmt, start, stop, target, fps, dpi))
+            clips.append((fmt, job.output, segments, clip_dir, count))
+
+        if max_workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                _render_task(task)
+        else:
+            workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(_render_task, tasks):
+                    pass
+
+        for fmt, output, segments, clip_dir, count in clips:
+            _stitch(fmt, output, segments, clip_dir, count, fps)
+    return [job.output for job in jobs]
+
+
+def export_clip(table, output, fps=DEFAULT_FPS, dpi=DEFAULT_DPI, max_workers=None):
+    """Exporta la animación de una sola simulación"""
+    return export_clips([ExportJob(table, output)], fps, dpi, max_workers)[0]
+
+
+def build_parser():
+    from simulacion import QUITO
+    parser = argparse.ArgumentParser(
+        description="Exporta la animación del seguidor a video o cuadros por sitio y día")
+    parser.add_argument('--fecha', type=date_type.fromisoformat, default=date_type.today(),
+                        help="fecha inicial (AAAA-MM-DD), por defecto hoy")
+    parser.add_argument('--hasta', type=date_type.fromisoformat, default=None,
+                        help="fecha final inclusive (AAAA-MM-DD), por defecto igual a --fecha")
+    parser.add_argument('--hora-inicio', type=int, default=6, help="hora local de inicio")
+    parser.add_argument('--duracion', type=int, default=12, help="duración diaria en horas")
+    parser.add_argument('--intervalo', type=int, default=15, help="intervalo en minutos")
+    parser.add_argument('--sitios', default=None,
+                        help=f"CSV de sitios como en flota.py (por defecto {QUITO.name})")
+    parser.add_argument('--formato', choices=('mp4', 'gif', 'png'), default='mp4',
+                        help="mp4, gif o png (un directorio de cuadros por clip)")
+    parser.add_argument('--fps', type=int, default=DEFAULT_FPS, help="cuadros por segundo")
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help="resolución de los cuadros")
+    parser.add_argument('--procesos', type=int, default=None,
+                        help="número de procesos (por defecto, uno por núcleo)")
+    parser.add_argument('--salida', required=True, help="directorio de salida")
+    return parser
+
+
+def main(argv=None):
+    from simulacion import QUITO, simulate_day
+
+    args = build_parser().parse_args(argv)
+    if args.intervalo <= 0 or args.duracion <= 0 or args.fps <= 0:
+        print("Error: la duración, el intervalo y los fps deben ser positivos", file=sys.stderr)
+        return 2
+    if args.sitios:
+        from flota import load_sites
+        sites = load_sites(args.sitios)
+    else:
+        sites = [QUITO]
+    os.makedirs(args.salida, exist_ok=True)
+
+    suffix = '' if args.formato == 'png' else f".{args.formato}"
+    jobs = []
+    end_date = args.hasta or args.fecha
+    for index, site in enumerate(sites):
+        day = args.fecha
+        while day <= end_date:
+            table = simulate_day(day, args.hora_inicio, args.duracion, args.intervalo, site)
+            jobs.append(ExportJob(table, os.path.join(args.salida, f"sitio{index:03d}_{day}{suffix}")))
+            day += timedelta(days=1)
+    try:
+        export_clips(jobs, args.fps, args.dpi, args.procesos)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
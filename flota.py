@@ -0,0 +1,162 @@
+"""Simulación de una flota de seguidores en varios sitios.
+
+Cada sitio tiene su propia latitud, longitud y zona horaria. El trabajo se
+divide en tareas (sitio, bloque de días) que se reparten entre procesos con
+``ProcessPoolExecutor`` y los resultados se unen en una sola tabla de
+columnas, ordenada por sitio y tiempo, con una columna ``site`` que indica
+el índice del sitio en la lista de entrada.
+
+Uso desde la línea de comandos::
+
+    python flota.py --sitios sitios.csv --fecha 2024-01-01 --hasta 2024-12-31 \\
+        --intervalo 5 --procesos 8 --formato columnar --salida flota/
+
+El archivo de sitios es un CSV con las columnas ``name,latitude,longitude,timezone``
+y, opcionalmente, ``altitude`` en metros.
+"""
+import argparse
+import csv
+import os
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date as date_type, timedelta
+
+import numpy as np
+
+from simulacion import COLUMNS, Site, iter_days, open_writer
+
+FleetJob = namedtuple('FleetJob', ['site', 'start_date', 'end_date'])
+
+# Días por tarea; bloques más pequeños reparten mejor la carga entre núcleos
+DAYS_PER_TASK = 31
+
+# Tareas en vuelo por proceso: acota la memoria de resultados pendientes
+TASKS_PER_WORKER = 2
+
+
+def make_jobs(sites, start_date, end_date):
+    """Crea un trabajo por sitio con el mismo rango de fechas"""
+    return [FleetJob(site, start_date, end_date) for site in sites]
+
+
+def split_jobs(jobs, days_per_task=DAYS_PER_TASK):
+    """Divide cada trabajo en bloques de días y devuelve (índice de sitio, tarea)"""
+    tasks = []
+    for index, job in enumerate(jobs):
+        if job.end_date < job.start_date:
+            raise ValueError(f"Rango de fechas inválido para {job.site.name}")
+        first = job.start_date
+        while first <= job.end_date:
+            last = min(first + timedelta(days=days_per_task - 1), job.end_date)
+            tasks.append((index, FleetJob(job.site, first, last)))
+            first = last + timedelta(days=1)
+    return tasks
+
+
+def _run_task(task, hour_start, duration_hours, time_step_minutes):
+    index, job = task
+    days = list(iter_days(job.start_date, job.end_date, hour_start, duration_hours,
+                          time_step_minutes, job.site))
+    table = {name: np.concatenate([d[name] for d in days]) for name in COLUMNS}
+    table['site'] = np.full(len(table['time']), index, dtype=np.int32)
+    return table
+
+
+def iter_fleet(jobs, hour_start, duration_hours, time_step_minutes,
+               max_workers=None, days_per_task=DAYS_PER_TASK):
+    """Genera las tablas parciales de la flota en orden (sitio, fecha).
+
+    Con ``max_workers=1`` se ejecuta en el proceso actual, sin pool. Con
+    varios procesos hay a lo sumo ``TASKS_PER_WORKER`` tareas por proceso
+    enviadas y sin entregar, así que la memoria no crece con la flota.
+    """
+    tasks = split_jobs(jobs, days_per_task)
+    args = (hour_start, duration_hours, time_step_minutes)
+    if max_workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _run_task(task, *args)
+        return
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = iter(tasks)
+        window = deque()
+        for task in pending:
+            window.append(executor.submit(_run_task, task, *args))
+            if len(window) >= TASKS_PER_WORKER * workers:
+                break
+        while window:
+            # Se entregan en orden de envío; cada resultado libera un lugar
+            table = window.popleft().result()
+            for task in pending:
+                window.append(executor.submit(_run_task, task, *args))
+                break
+            yield table
+
+
+def simulate_fleet(jobs, hour_start, duration_hours, time_step_minutes,
+                   max_workers=None, days_per_task=DAYS_PER_TASK):
+    """Simula todos los trabajos en paralelo y une los resultados en una tabla"""
+    parts = list(iter_fleet(jobs, hour_start, duration_hours, time_step_minutes,
+                            max_workers, days_per_task))
+    if not parts:
+        raise ValueError("No hay sitios para simular")
+    return {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS + ('site',)}
+
+
+def load_sites(path):
+    """Lee la lista de sitios desde un CSV (name,latitude,longitude,timezone[,altitude])"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [Site(row['name'], float(row['latitude']), float(row['longitude']),
+                     row['timezone'], float(row.get('altitude') or 0.0))
+                for row in csv.DictReader(f)]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Simulación de una flota de seguidores solares en varios sitios")
+    parser.add_argument('--sitios', required=True,
+                        help="CSV con las columnas name,latitude,longitude,timezone")
+    parser.add_argument('--fecha', type=date_type.fromisoformat, required=True,
+                        help="fecha inicial (AAAA-MM-DD)")
+    parser.add_argument('--hasta', type=date_type.fromisoformat, default=None,
+                        help="fecha final inclusive (AAAA-MM-DD), por defecto igual a --fecha")
+    parser.add_argument('--hora-inicio', type=int, default=6, help="hora local de inicio")
+    parser.add_argument('--duracion', type=int, default=12, help="duración diaria en horas")
+    parser.add_argument('--intervalo', type=int, default=15, help="intervalo en minutos")
+    parser.add_argument('--procesos', type=int, default=None,
+                        help="número de procesos (por defecto, uno por núcleo)")
+    parser.add_argument('--formato', choices=('csv', 'columnar'), default='csv',
+                        help="csv, o columnar (directorio binario, ver almacenamiento.py)")
+    parser.add_argument('--salida', default='-',
+                        help="archivo CSV o directorio columnar de salida ('-' = stdout)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.intervalo <= 0 or args.duracion <= 0:
+        print("Error: la duración y el intervalo deben ser positivos", file=sys.stderr)
+        return 2
+    sites = load_sites(args.sitios)
+    jobs = make_jobs(sites, args.fecha, args.hasta or args.fecha)
+
+    if args.formato == 'columnar' and args.salida == '-':
+        print("Error: el formato columnar necesita --salida", file=sys.stderr)
+        return 2
+
+    writer = open_writer(args.formato, args.salida, [site.name for site in sites])
+    try:
+        for part in iter_fleet(jobs, args.hora_inicio, args.duracion, args.intervalo,
+                               args.procesos):
+            writer.append(part)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Medición opcional de tiempos por etapa.
+
+Las etapas costosas (posición solar, cuadros de la animación, dibujo del
+lienzo, reportes) se marcan con ``timed`` o ``measure``. Mientras la
+medición está desactivada el único costo es comprobar una bandera; al
+activarla cada llamada se acumula en un histograma logarítmico por etapa
+(cuenta, total, mínimo, máximo y percentiles aproximados).
+
+Se activa con ``enable()``, con la variable de entorno ``SEGUIDOR_PERFIL=1``
+o con ``--perfil ARCHIVO`` en los programas de línea de comandos, que al
+terminar escriben el resumen en JSON con ``dump_json``.
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Cubetas del histograma: 4 por década entre 1 µs y 100 s
+BUCKETS_PER_DECADE = 4
+MIN_SECONDS = 1e-6
+BUCKET_COUNT = 8 * BUCKETS_PER_DECADE + 1
+
+_enabled = os.environ.get('SEGUIDOR_PERFIL', '') not in ('', '0')
+_lock = threading.Lock()
+_stages = {}
+
+
+class StageHistogram:
+    """Histograma de duraciones de una etapa"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = [0] * BUCKET_COUNT
+
+    @staticmethod
+    def bucket(seconds):
+        if seconds <= MIN_SECONDS:
+            return 0
+        index = int(math.log10(seconds / MIN_SECONDS) * BUCKETS_PER_DECADE) + 1
+        return min(index, BUCKET_COUNT - 1)
+
+    @staticmethod
+    def bucket_limit(index):
+        """Límite superior (s) de la cubeta ``index``"""
+        return MIN_SECONDS * 10 ** (index / BUCKETS_PER_DECADE)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[self.bucket(seconds)] += 1
+
+    def percentile(self, q):
+        """Percentil aproximado: límite superior de la cubeta que lo contiene"""
+        if not self.count:
+            return 0.0
+        target = q / 100.0 * self.count
+        running = 0
+        for index, count in enumerate(self.buckets):
+            running += count
+            if running >= target:
+                return min(self.bucket_limit(index), self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'mean_s': self.total / self.count if self.count else 0.0,
+            'min_s': self.min if self.count else 0.0,
+            'max_s': self.max,
+            'p50_s': self.percentile(50),
+            'p95_s': self.percentile(95),
+            'p99_s': self.percentile(99),
+            'buckets': {f"{self.bucket_limit(i):.3g}": n for i, n in enumerate(self.buckets) if n},
+        }
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+
+def record(stage, seconds):
+    with _lock:
+        histogram = _stages.get(stage)
+        if histogram is None:
+            histogram = _stages[stage] = StageHistogram()
+        histogram.add(seconds)
+
+
+@contextmanager
+def measure(stage):
+    """Mide el bloque ``with`` si la medición está activa"""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def timed(stage):
+    """Decorador que mide cada llamada a la función como ``stage``"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """Resumen de todas las etapas como diccionario serializable"""
+    with _lock:
+        return {stage: histogram.as_dict() for stage, histogram in sorted(_stages.items())}
+
+
+def summary_lines():
+    """Una línea por etapa: llamadas, media y p95 en milisegundos"""
+    return [f"{stage}: {s['count']} × {s['mean_s'] * 1000:.2f} ms (p95 {s['p95_s'] * 1000:.2f} ms)"
+            for stage, s in snapshot().items()]
+
+
+def dump_json(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'stages': snapshot()}, f, indent=2)
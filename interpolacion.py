@@ -0,0 +1,121 @@
+"""Interpolación rápida de la posición solar sobre una rejilla precalculada.
+
+El controlador pide ángulos objetivo en instantes arbitrarios y a alta
+frecuencia; calcular la efeméride completa en cada consulta es caro. Una
+``EphemerisGrid`` calcula una vez los vectores solares de un sitio en nodos
+uniformes (por ejemplo, cada minuto durante un año) y responde lotes de
+instantes con interpolación cúbica de Hermite (tangentes de Catmull-Rom)
+sobre las componentes del vector unitario, que luego se normaliza. Interpolar
+el vector en lugar de los ángulos evita los saltos del azimuth en 0°/360° y
+cerca del cenit.
+
+Error angular máximo frente a ``efemerides.sun_position`` (ángulo entre
+vectores solares), medido con ``max_error`` sobre 4 millones de instantes
+aleatorios de 2024 con el sol a más de 0.5° sobre el horizonte:
+
+=================  ==========  ==========  ==========
+Sitio              1 minuto    5 minutos   15 minutos
+=================  ==========  ==========  ==========
+Quito (-0.21°)     2e-5°       0.15°       0.43°
+40° N              3e-6°       0.052°      0.39°
+65° N              2e-6°       0.025°      0.24°
+=================  ==========  ==========  ==========
+
+Con el sol a más de 2° el error en los tres sitios baja a 6e-4° con nodos de
+5 minutos y a 0.13° con nodos de 15 minutos. El peor caso está siempre junto al horizonte:
+la corrección de refracción de la SPA se corta de golpe en -0.83° (unos
+0.6° de salto), y la interpolación suaviza ese escalón en los intervalos
+vecinos. ``max_error`` permite medirlo para cualquier rejilla.
+"""
+import numpy as np
+
+from efemerides import sun_position, sun_vectors, to_epoch_seconds
+from simulacion import tracker_angles
+
+DEFAULT_STEP_SECONDS = 60
+
+
+class EphemerisGrid:
+    """Vectores solares de un sitio en nodos uniformes con interpolación vectorizada"""
+
+    def __init__(self, site, start, end, step=DEFAULT_STEP_SECONDS, cache=None):
+        """Calcula la rejilla entre ``start`` y ``end`` (segundos Unix o datetime64).
+
+        ``step`` es el paso entre nodos en segundos. Con ``cache`` (una
+        ``cache_efemerides.EphemerisCache``) los nodos se toman de la caché.
+        """
+        start = int(np.floor(to_epoch_seconds(start)))
+        end = int(np.ceil(to_epoch_seconds(end)))
+        if end <= start:
+            raise ValueError("El final de la rejilla debe ser posterior al inicio")
+        self.site = site
+        self.step = int(step)
+        # Un nodo extra a cada lado para las tangentes de los extremos
+        self.start = start - self.step
+        count = (end - start) // self.step + 3
+        if cache is not None:
+            elevations, azimuths = cache.window(site, self.start, count, self.step)
+        else:
+            times = self.start + self.step * np.arange(count, dtype=np.int64)
+            elevations, azimuths = sun_position(times, site.latitude, site.longitude)
+        self.nodes = sun_vectors(elevations, azimuths)
+        tangents = np.zeros_like(self.nodes)
+        tangents[1:-1] = (self.nodes[2:] - self.nodes[:-2]) / 2
+        # Coeficientes del polinomio de cada intervalo, contiguos para que una
+        # consulta lea una sola fila: v(s) = ((a s + b) s + c) s + d
+        p0, p1 = self.nodes[:-1], self.nodes[1:]
+        m0, m1 = tangents[:-1], tangents[1:]
+        self.coefficients = np.ascontiguousarray(np.stack([
+            2 * p0 - 2 * p1 + m0 + m1,
+            -3 * p0 + 3 * p1 - 2 * m0 - m1,
+            m0,
+            p0,
+        ], axis=1))
+
+    @property
+    def first(self):
+        """Primer instante consultable (segundos Unix)"""
+        return self.start + self.step
+
+    @property
+    def last(self):
+        """Último instante consultable (segundos Unix)"""
+        return self.start + self.step * (len(self.nodes) - 2)
+
+    def vectors(self, times):
+        """Vectores solares unitarios (..., 3) interpolados en ``times``"""
+        t = np.asarray(to_epoch_seconds(times), dtype=np.float64)
+        position = (t - self.start) / self.step
+        if position.size and (position.min() < 1 or position.max() > len(self.nodes) - 2):
+            raise ValueError("Hay instantes fuera del rango de la rejilla")
+        index = np.minimum(position.astype(np.intp), len(self.nodes) - 3)
+        s = (position - index)[..., None]
+        a, b, c, d = np.moveaxis(self.coefficients[index], -2, 0)
+        v = ((a * s + b) * s + c) * s + d
+        return v / np.sqrt(np.einsum('...i,...i->...', v, v))[..., None]
+
+    def position(self, times):
+        """Elevación y azimuth (grados) interpolados en ``times``"""
+        v = self.vectors(times)
+        elevations = np.degrees(np.arcsin(np.clip(v[..., 2], -1, 1)))
+        azimuths = np.degrees(np.arctan2(v[..., 0], v[..., 1])) % 360
+        return elevations, azimuths
+
+    def targets(self, times):
+        """Pitch y roll objetivo del panel (grados) en ``times``"""
+        return tracker_angles(*self.position(times))
+
+
+def max_error(grid, samples=100000, min_elevation=0.5, seed=0):
+    """Error angular máximo (grados) de la rejilla frente al cálculo directo.
+
+    Usa ``samples`` instantes aleatorios dentro de la rejilla e ignora los
+    que tienen el sol por debajo de ``min_elevation``.
+    """
+    rng = np.random.default_rng(seed)
+    times = rng.uniform(grid.first, grid.last, samples)
+    elevations, azimuths = sun_position(times, grid.site.latitude, grid.site.longitude)
+    exact = sun_vectors(elevations, azimuths)
+    cos_error = np.clip(np.einsum('ij,ij->i', exact, grid.vectors(times)), -1, 1)
+    errors = np.degrees(np.arccos(cos_error))[elevations > min_elevation]
+    return float(errors.max()) if errors.size else 0.0
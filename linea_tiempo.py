@@ -0,0 +1,77 @@
+"""Líneas de tiempo vectorizadas y conversión UTC <-> hora local por lotes.
+
+Las conversiones usan las tablas de transiciones de pytz (instantes UTC en
+que cambia el desfase y el desfase de cada tramo) con ``np.searchsorted``,
+así que convertir un año de muestras cuesta una búsqueda binaria por
+muestra en C en lugar de un ``datetime`` de Python por muestra, y los
+cambios de horario de verano dentro de una ventana se respetan.
+
+Una hora local inexistente (el salto de primavera) o ambigua (la hora que
+se repite en otoño) se resuelve como ``localize(..., is_dst=False)`` de pytz:
+se toma el horario estándar.
+"""
+from functools import lru_cache
+
+import numpy as np
+from pytz import timezone
+
+
+@lru_cache(maxsize=None)
+def transitions(tz_name):
+    """(inicios UTC, desfases en segundos, es_verano) de los tramos de la zona"""
+    tz = timezone(tz_name)
+    if not hasattr(tz, '_utc_transition_times'):  # zona de desfase fijo
+        offset = int(tz.utcoffset(None).total_seconds())
+        return (np.array([np.iinfo(np.int64).min]), np.array([offset], dtype=np.int64),
+                np.array([False]))
+    starts = np.array(tz._utc_transition_times, dtype='datetime64[s]').astype(np.int64)
+    starts[0] = np.iinfo(np.int64).min  # el primer tramo no tiene inicio
+    info = tz._transition_info
+    offsets = np.array([int(utcoffset.total_seconds()) for utcoffset, _, _ in info], dtype=np.int64)
+    dst = np.array([bool(dst) for _, dst, _ in info])
+    return starts, offsets, dst
+
+
+def utc_offsets(utc_times, tz_name):
+    """Desfase (s) de la hora local respecto a UTC en cada instante"""
+    starts, offsets, _ = transitions(tz_name)
+    t = np.asarray(utc_times, dtype='datetime64[s]').astype(np.int64)
+    return offsets[np.searchsorted(starts, t, side='right') - 1]
+
+
+def to_local(utc_times, tz_name):
+    """Hora local de pared (``datetime64[s]`` sin zona) de instantes UTC"""
+    t = np.asarray(utc_times, dtype='datetime64[s]')
+    return t + utc_offsets(t, tz_name).astype('timedelta64[s]')
+
+
+def to_utc(local_times, tz_name):
+    """Instantes UTC de horas locales de pared (ver la nota sobre ambigüedad)"""
+    starts, offsets, dst = transitions(tz_name)
+    local = np.asarray(local_times, dtype='datetime64[s]').astype(np.int64)
+    # Cada tramo j cubre las horas locales [inicio_j + desfase_j, inicio_j+1 + desfase_j)
+    local_starts = starts.copy()
+    local_starts[1:] += offsets[1:]
+    local_ends = np.append(starts[1:] + offsets[:-1], np.iinfo(np.int64).max)
+    j = np.clip(np.searchsorted(local_starts, local, side='right') - 1, 0, len(offsets) - 1)
+    valid = local < local_ends[j]
+    previous = np.maximum(j - 1, 0)
+    # Ambigua: también vale el tramo anterior; se prefiere el estándar
+    ambiguous = valid & (j > 0) & (local < local_ends[previous])
+    j = np.where(ambiguous & dst[j] & ~dst[previous], previous, j)
+    # Inexistente: cae entre el fin de j y el inicio de j+1; se usa el estándar
+    following = np.minimum(j + 1, len(offsets) - 1)
+    j = np.where(~valid & dst[j] & ~dst[following], following, j)
+    return (local - offsets[j]).astype('datetime64[s]')
+
+
+def timeline(local_start, duration_seconds, step_seconds, tz_name):
+    """Rejilla uniforme en tiempo real desde una hora local de inicio.
+
+    Devuelve (instantes UTC, horas locales) como ``datetime64[s]``. El paso
+    es uniforme en UTC: en un cambio de horario la hora local salta o se
+    repite, pero la rejilla no pierde ni duplica muestras.
+    """
+    start = to_utc(np.datetime64(local_start, 's'), tz_name)
+    utc = start + np.arange(0, duration_seconds, step_seconds).astype('timedelta64[s]')
+    return utc, to_local(utc, tz_name)
@@ -0,0 +1,236 @@
+"""Planificador de movimientos de los actuadores del seguidor.
+
+La simulación entrega el pitch/roll ideal en cada muestra; mandar un
+comando por muestra desgasta los motores y gasta energía en movimientos
+diminutos. Este módulo convierte esa trayectoria ideal en un programa
+reducido de comandos aplicando una política de movimiento:
+
+* ``deadband``: solo se mueve si algún eje se alejó más de estos grados del
+  último comando,
+* ``max_rate``: velocidad máxima de giro de los actuadores (grados/minuto),
+* ``batch_minutes``: los comandos solo se emiten en múltiplos de este
+  intervalo (0 = en cualquier muestra).
+
+El costo de una política es el error de apuntamiento entre la normal real
+del panel y el vector solar mientras el sol está sobre el horizonte.
+
+La lógica de banda muerta depende del comando anterior, así que el tiempo se
+recorre muestra a muestra; lo vectorizado es el eje de políticas: ``sweep``
+evalúa miles de combinaciones de parámetros en una sola pasada.
+
+Uso desde la línea de comandos::
+
+    python planificador.py --fecha 2024-03-21 --intervalo 1 \\
+        --banda 0.5 1 2 --velocidad 5 30 --lote 0 5 15 > politicas.csv
+"""
+import argparse
+import csv
+import itertools
+import sys
+from collections import namedtuple
+from datetime import date as date_type
+
+import numpy as np
+
+from simulacion import QUITO, Site, sample_durations, series_breaks, simulate
+
+MotionPolicy = namedtuple('MotionPolicy', ['deadband', 'max_rate', 'batch_minutes'])
+
+DEFAULT_POLICY = MotionPolicy(deadband=1.0, max_rate=30.0, batch_minutes=5)
+
+COST_COLUMNS = ('moves', 'travel', 'mean_error', 'max_error', 'cosine_loss')
+
+
+def _policy_arrays(policies):
+    values = np.array([tuple(p) for p in policies], dtype=np.float64).reshape(-1, 3)
+    deadband, max_rate, batch_minutes = values.T
+    return deadband, np.where(max_rate > 0, max_rate, np.inf), batch_minutes
+
+
+def _normals(pitch, roll):
+    """Normal del panel (x=Este, y=Norte, z=Arriba) para pitch/roll en grados"""
+    elevation = np.radians(90 - pitch)
+    azimuth = np.radians(roll)
+    return np.cos(elevation) * np.sin(azimuth), np.cos(elevation) * np.cos(azimuth), np.sin(elevation)
+
+
+def _run(table, deadband, max_rate, batch_minutes, record=False):
+    """Recorre la simulación aplicando todas las políticas a la vez.
+
+    Los comandos de la muestra ``k`` se emiten al inicio del intervalo que
+    termina en ``k`` (la efeméride se conoce de antemano), y los actuadores
+    avanzan hacia ellos sin superar ``max_rate``. En cada corte de la serie
+    (la noche entre dos ventanas diarias) los actuadores se reposicionan en
+    la consigna y el plan empieza de nuevo.
+    """
+    t = np.asarray(table['time'], dtype='datetime64[s]').astype(np.int64)
+    n = len(t)
+    if n == 0:
+        raise ValueError("La simulación no tiene muestras")
+    target_pitch = np.asarray(table['pitch'], dtype=np.float64)
+    # El roll sigue al azimuth; se desenvuelve para no girar 360° al cruzar el norte
+    target_roll = np.unwrap(np.asarray(table['roll'], dtype=np.float64), period=360)
+    sun = np.asarray(table['sun_vector'], dtype=np.float64)
+    daylight = np.asarray(table['elevation']) > 0
+
+    elapsed = t - t[0]
+    step_minutes = np.diff(t, prepend=t[0]) / 60.0
+    restart = np.zeros(n, dtype=bool)
+    if n > 1:
+        restart[1:] = series_breaks(np.diff(t))
+    # Peso de cada muestra: duración del intervalo que representa
+    weights = sample_durations(table['time'])
+    batch_seconds = np.where(batch_minutes > 0, batch_minutes * 60, 1)
+
+    size = len(deadband)
+    command_pitch = np.full(size, target_pitch[0])
+    command_roll = np.full(size, target_roll[0])
+    pitch = command_pitch.copy()
+    roll = command_roll.copy()
+    last_epoch = np.zeros(size)
+    moves = np.ones(size, dtype=np.int64)
+    travel = np.zeros(size)
+    error_sum = np.zeros(size)
+    error_max = np.zeros(size)
+    loss_sum = np.zeros(size)
+    daylight_seconds = 0.0
+    issued = [0] if record else None
+
+    for k in range(n):
+        if restart[k]:
+            travel += np.abs(target_pitch[k] - pitch) + np.abs(target_roll[k] - roll)
+            command_pitch = np.full(size, target_pitch[k])
+            command_roll = np.full(size, target_roll[k])
+            pitch = command_pitch.copy()
+            roll = command_roll.copy()
+            last_epoch = elapsed[k] // batch_seconds
+            moves += 1
+            if record:
+                issued.append(k)
+        elif k > 0:
+            epoch = elapsed[k] // batch_seconds
+            due = epoch > last_epoch
+            offset = np.maximum(np.abs(target_pitch[k] - command_pitch),
+                                np.abs(target_roll[k] - command_roll))
+            move = due & (offset > deadband)
+            command_pitch = np.where(move, target_pitch[k], command_pitch)
+            command_roll = np.where(move, target_roll[k], command_roll)
+            last_epoch = np.where(due, epoch, last_epoch)
+            moves += move
+            if record and move[0]:
+                issued.append(k)
+
+            limit = max_rate * step_minutes[k]
+            d_pitch = np.clip(command_pitch - pitch, -limit, limit)
+            d_roll = np.clip(command_roll - roll, -limit, limit)
+            pitch += d_pitch
+            roll += d_roll
+            travel += np.abs(d_pitch) + np.abs(d_roll)
+
+        if daylight[k]:
+            nx, ny, nz = _normals(pitch, roll)
+            cos_error = np.clip(nx * sun[k, 0] + ny * sun[k, 1] + nz * sun[k, 2], -1, 1)
+            error = np.degrees(np.arccos(cos_error))
+            error_sum += error * weights[k]
+            loss_sum += (1 - cos_error) * weights[k]
+            np.maximum(error_max, error, out=error_max)
+            daylight_seconds += weights[k]
+
+    daylight_seconds = daylight_seconds or 1.0
+    costs = {
+        'moves': moves,
+        'travel': travel,
+        'mean_error': error_sum / daylight_seconds,
+        'max_error': error_max,
+        'cosine_loss': loss_sum / daylight_seconds,
+    }
+    if not record:
+        return costs, None
+    issued = np.array(issued)
+    schedule = {
+        'time': np.asarray(table['time'])[issued],
+        'pitch': target_pitch[issued],
+        'roll': target_roll[issued] % 360,
+    }
+    return costs, schedule
+
+
+def sweep(table, policies):
+    """Evalúa muchas políticas sobre la misma simulación.
+
+    Devuelve un diccionario de arreglos (uno por política) con el número de
+    comandos (``moves``), el recorrido total de los dos ejes en grados
+    (``travel``), el error de apuntamiento medio y máximo en grados y la
+    pérdida media por coseno (``1 - cos(error)``) con el sol sobre el horizonte.
+    """
+    costs, _ = _run(table, *_policy_arrays(policies))
+    return costs
+
+
+def plan(table, policy=DEFAULT_POLICY):
+    """Programa reducido de comandos y costo de una política.
+
+    Devuelve ``(schedule, cost)``: ``schedule`` son las columnas ``time``,
+    ``pitch`` y ``roll`` de cada comando emitido y ``cost`` los mismos
+    indicadores de ``sweep`` como escalares.
+    """
+    costs, schedule = _run(table, *_policy_arrays([policy]), record=True)
+    return schedule, {name: values[0].item() for name, values in costs.items()}
+
+
+def cost_summary(cost, samples):
+    """Líneas de resumen con el formato del reporte"""
+    return [
+        f"• Comandos al actuador: {cost['moves']} de {samples} muestras",
+        f"• Error de apuntamiento: {cost['mean_error']:.2f}° medio, "
+        f"{cost['max_error']:.2f}° maximo",
+    ]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Barrido de políticas de movimiento de los actuadores")
+    parser.add_argument('--fecha', type=date_type.fromisoformat, default=date_type.today(),
+                        help="fecha inicial (AAAA-MM-DD), por defecto hoy")
+    parser.add_argument('--hasta', type=date_type.fromisoformat, default=None,
+                        help="fecha final inclusive (AAAA-MM-DD), por defecto igual a --fecha")
+    parser.add_argument('--hora-inicio', type=int, default=6, help="hora local de inicio")
+    parser.add_argument('--duracion', type=int, default=12, help="duración diaria en horas")
+    parser.add_argument('--intervalo', type=int, default=15, help="intervalo en minutos")
+    parser.add_argument('--lat', type=float, default=QUITO.latitude, help="latitud (grados)")
+    parser.add_argument('--lon', type=float, default=QUITO.longitude, help="longitud (grados)")
+    parser.add_argument('--zona', default=QUITO.timezone, help="zona horaria IANA del sitio")
+    parser.add_argument('--banda', type=float, nargs='+', default=[DEFAULT_POLICY.deadband],
+                        help="bandas muertas a evaluar (grados)")
+    parser.add_argument('--velocidad', type=float, nargs='+', default=[DEFAULT_POLICY.max_rate],
+                        help="velocidades máximas a evaluar (grados/minuto, 0 = sin límite)")
+    parser.add_argument('--lote', type=float, nargs='+', default=[DEFAULT_POLICY.batch_minutes],
+                        help="intervalos entre comandos a evaluar (minutos, 0 = libre)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.intervalo <= 0 or args.duracion <= 0:
+        print("Error: la duración y el intervalo deben ser positivos", file=sys.stderr)
+        return 2
+    site = Site("Sitio", args.lat, args.lon, args.zona)
+    try:
+        table = simulate(args.fecha, args.hasta or args.fecha, args.hora_inicio, args.duracion,
+                         args.intervalo, site)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    policies = [MotionPolicy(*p) for p in itertools.product(args.banda, args.velocidad, args.lote)]
+    costs = sweep(table, policies)
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(MotionPolicy._fields + COST_COLUMNS)
+    for i, policy in enumerate(policies):
+        writer.writerow(list(policy) + [f"{costs[name][i]:.4f}" if name != 'moves'
+                                        else costs[name][i] for name in COST_COLUMNS])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""Generación de reportes del seguidor solar con Pillow.
+
+El reporte tiene el mismo contenido que el de la interfaz (configuración,
+tabla de seguimiento y resumen estadístico), pero la tabla incluye todas
+las muestras y se reparte en tantas páginas como haga falta en lugar de
+cortarse al llegar al final de la imagen. Las páginas se guardan como un
+PDF o TIFF de varias páginas, o como una imagen por página para PNG/JPEG.
+
+Las fuentes se cargan una sola vez por proceso y el texto de las celdas,
+que se repite mucho (horas, ángulos con un decimal, observaciones), se
+rasteriza una vez y se reutiliza, así que generar cientos de reportes en
+lote es barato.
+
+Uso desde la línea de comandos (un reporte por sitio y día)::
+
+    python reporte.py --fecha 2024-03-01 --hasta 2024-03-31 --intervalo 5 \\
+        --formato pdf --salida reportes/
+"""
+import argparse
+import os
+import sys
+import warnings
+from datetime import date as date_type, timedelta
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from instrumentacion import timed
+
+PAGE_SIZE = (1200, 1600)
+MARGIN = 50
+ROW_HEIGHT = 25
+STAT_HEIGHT = 20
+FOOTER_HEIGHT = 60
+
+# Se prueba la primera fuente disponible; si no hay ninguna se usa la de Pillow
+FONT_CANDIDATES = ("arial.ttf", "Arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf")
+TITLE_SIZE = 24
+HEADER_SIZE = 16
+DATA_SIZE = 12
+
+TABLE_HEADERS = ["Hora", "Elevacion (°)", "Azimuth (°)", "Pitch (°)", "Roll (°)", "Observaciones"]
+COLUMN_WIDTHS = [80, 100, 100, 80, 80, 200]
+# Caracteres de una observación que caben en su columna
+OBSERVATION_CHARS = 30
+
+MULTIPAGE_FORMATS = {'.pdf': 'PDF', '.tif': 'TIFF', '.tiff': 'TIFF'}
+
+
+@lru_cache(maxsize=None)
+def load_font(size):
+    """Fuente TrueType del tamaño pedido, cargada una vez por proceso"""
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    warnings.warn("No se encontró ninguna fuente TrueType; se usa la fuente por defecto")
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow < 10.1 no acepta tamaño
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=65536)
+def _text_mask(text, size):
+    """Máscara rasterizada de un texto; las celdas repetidas se dibujan una vez"""
+    font = load_font(size)
+    left, top, right, bottom = font.getbbox(text)
+    mask = Image.new('L', (max(right, 1), max(bottom, 1)), 0)
+    ImageDraw.Draw(mask).text((0, 0), text, fill=255, font=font)
+    return mask
+
+
+def _draw_cell(page, position, text, size=DATA_SIZE):
+    page.paste(0, position, _text_mask(text, size))
+
+
+def observations(elevations, azimuths):
+    """Observación de cada muestra según sus ángulos (vectorizado).
+
+    Los textos más largos que ``OBSERVATION_CHARS`` se cortan con "...".
+    """
+    e = np.asarray(elevations)
+    a = np.asarray(azimuths)
+    conditions = [
+        e < 10,
+        e > 70,
+        (e >= 30) & (e <= 70),
+        (a > 270) | (a < 90),
+        (a >= 90) & (a <= 270),
+    ]
+    choices = [
+        "Sol bajo en horizonte",
+        "Sol en cenit - maxima radiacion",
+        "Condiciones optimas",
+        "Sol hacia el este",
+        "Sol hacia el oeste",
+    ]
+    choices = [c[:OBSERVATION_CHARS] + "..." if len(c) > OBSERVATION_CHARS else c
+               for c in choices]
+    return np.select(conditions, choices, default="Seguimiento normal")
+
+
+def table_rows(table, time_unit='m'):
+    """Filas de texto de la tabla del reporte para todas las muestras"""
+    local_times = np.datetime_as_string(np.asarray(table['local_time'], dtype='datetime64[s]'),
+                                        unit=time_unit)
+    hours = [t[11:] for t in local_times]
+    columns = [np.char.mod('%.1f', np.asarray(table[name], dtype=np.float64))
+               for name in ('elevation', 'azimuth', 'pitch', 'roll')]
+    notes = observations(table['elevation'], table['azimuth'])
+    return list(zip(hours, *(c.tolist() for c in columns), notes.tolist()))
+
+
+class ReportLayout:
+    """Reparte el contenido del reporte en páginas de tamaño fijo"""
+
+    def __init__(self, page_size=PAGE_SIZE):
+        self.width, self.height = page_size
+        self.x_positions = [MARGIN]
+        for width in COLUMN_WIDTHS[:-1]:
+            self.x_positions.append(self.x_positions[-1] + width)
+        self.pages = []
+        self.page = None
+        self.draw = None
+        self.y = 0
+
+    @property
+    def bottom(self):
+        return self.height - FOOTER_HEIGHT
+
+    def new_page(self):
+        self.page = Image.new('L', (self.width, self.height), 255)
+        self.draw = ImageDraw.Draw(self.page)
+        self.pages.append(self.page)
+        self.y = 30
+
+    def text(self, text, size, height, x=MARGIN):
+        if self.page is None or self.y + height > self.bottom:
+            self.new_page()
+        self.draw.text((x, self.y), text, fill=0, font=load_font(size))
+        self.y += height
+
+    def table_header(self):
+        for header, x in zip(TABLE_HEADERS, self.x_positions):
+            self.draw.text((x, self.y), header, fill=0, font=load_font(HEADER_SIZE))
+        self.y += 30
+        self.draw.line([(MARGIN - 10, self.y), (self.width - MARGIN + 10, self.y)], fill=0, width=2)
+        self.y += 15
+
+    def table(self, rows):
+        if self.page is None or self.y + 45 + ROW_HEIGHT > self.bottom:
+            self.new_page()
+        self.table_header()
+        for i, row in enumerate(rows):
+            if self.y + ROW_HEIGHT > self.bottom:
+                self.new_page()
+                self.table_header()
+            if i % 2 == 1:
+                self.draw.rectangle([(MARGIN - 10, self.y - 5), (self.width - MARGIN + 10, self.y + 20)],
+                                    fill=240)
+            for text, x in zip(row, self.x_positions):
+                _draw_cell(self.page, (x, self.y), text)
+            self.y += ROW_HEIGHT
+
+    def finish(self):
+        """Numera las páginas y las devuelve (imágenes en escala de grises)"""
+        total = len(self.pages)
+        for number, page in enumerate(self.pages, 1):
+            ImageDraw.Draw(page).text((self.width - MARGIN - 120, self.height - 40),
+                                      f"Pagina {number} de {total}", fill=0,
+                                      font=load_font(DATA_SIZE))
+        return self.pages
+
+
+@timed('render_report')
+def render_report(config_lines, table, summary_lines, time_unit='m', page_size=PAGE_SIZE):
+    """Dibuja el reporte completo y devuelve la lista de páginas"""
+    layout = ReportLayout(page_size)
+    layout.new_page()
+    title = "REPORTE DE SEGUIDOR SOLAR 2-DOF"
+    layout.draw.text((layout.width // 2 - 200, layout.y), title, fill=0, font=load_font(TITLE_SIZE))
+    layout.y += 60
+    for line in config_lines:
+        layout.text(line, HEADER_SIZE, 25)
+    layout.y += 20
+    layout.text("DATOS DE SEGUIMIENTO SOLAR", HEADER_SIZE, 40)
+    layout.table(table_rows(table, time_unit))
+    layout.y += 30
+    layout.text("RESUMEN ESTADISTICO", HEADER_SIZE, 30)
+    for line in summary_lines:
+        layout.text(line, DATA_SIZE, STAT_HEIGHT)
+    return layout.finish()
+
+
+@timed('save_pages')
+def save_pages(pages, filename):
+    """Guarda las páginas y devuelve la lista de archivos escritos.
+
+    PDF y TIFF guardan todas las páginas en un archivo; otros formatos
+    escriben ``nombre.ext`` para la primera página y ``nombre_pNN.ext`` para
+    las siguientes.
+    """
+    root, ext = os.path.splitext(filename)
+    fmt = MULTIPAGE_FORMATS.get(ext.lower())
+    if fmt is not None:
+        options = {'resolution': 144.0} if fmt == 'PDF' else {}
+        pages[0].save(filename, fmt, save_all=True, append_images=pages[1:], **options)
+        return [filename]
+    written = []
+    for number, page in enumerate(pages, 1):
+        path = filename if number == 1 else f"{root}_p{number:02d}{ext}"
+        page.save(path, quality=95)
+        written.append(path)
+    return written
+
+
+def config_lines(site, day, hour_start, duration_hours, time_step_minutes, samples):
+    """Líneas de configuración del reporte, con el formato de la interfaz"""
+    return [
+        f"Fecha de simulacion: {day}",
+        f"Hora de inicio: {hour_start}:00",
+        f"Duracion: {duration_hours} horas",
+        f"Intervalo: {time_step_minutes} minutos",
+        f"Ubicacion: {site.name} ({site.latitude:.4f}°, {site.longitude:.4f}°)",
+        f"Zona horaria: {site.timezone}",
+        f"Total de mediciones: {samples}",
+    ]
+
+
+def build_parser():
+    from simulacion import QUITO
+    parser = argparse.ArgumentParser(description="Reportes del seguidor solar por sitio y día")
+    parser.add_argument('--fecha', type=date_type.fromisoformat, default=date_type.today(),
+                        help="fecha inicial (AAAA-MM-DD), por defecto hoy")
+    parser.add_argument('--hasta', type=date_type.fromisoformat, default=None,
+                        help="fecha final inclusive (AAAA-MM-DD), por defecto igual a --fecha")
+    parser.add_argument('--hora-inicio', type=int, default=6, help="hora local de inicio")
+    parser.add_argument('--duracion', type=int, default=12, help="duración diaria en horas")
+    parser.add_argument('--intervalo', type=int, default=15, help="intervalo en minutos")
+    parser.add_argument('--sitios', default=None,
+                        help=f"CSV de sitios como en flota.py (por defecto {QUITO.name})")
+    parser.add_argument('--formato', choices=('pdf', 'tiff', 'png'), default='pdf',
+                        help="formato de cada reporte")
+    parser.add_argument('--salida', required=True, help="directorio de salida")
+    parser.add_argument('--perfil', default=None, metavar='ARCHIVO',
+                        help="mide los tiempos por etapa y los guarda en ARCHIVO (JSON)")
+    return parser
+
+
+def main(argv=None):
+    from agregacion import summary_lines
+    from energia import EnergyYield
+    from simulacion import QUITO, TrackingStats, simulate_day
+    from sombreado import ShadingStats
+
+    args = build_parser().parse_args(argv)
+    if args.intervalo <= 0 or args.duracion <= 0:
+        print("Error: la duración y el intervalo deben ser positivos", file=sys.stderr)
+        return 2
+    if args.sitios:
+        from flota import load_sites
+        sites = load_sites(args.sitios)
+    else:
+        sites = [QUITO]
+    os.makedirs(args.salida, exist_ok=True)
+    if args.perfil:
+        import instrumentacion
+        instrumentacion.enable()
+
+    end_date = args.hasta or args.fecha
+    for index, site in enumerate(sites):
+        day = args.fecha
+        while day <= end_date:
+            table = simulate_day(day, args.hora_inicio, args.duracion, args.intervalo, site)
+            summary = (TrackingStats().update(table).summary()
+                       + EnergyYield(site.latitude, site.altitude).update(table).summary()
+                       + ShadingStats(altitude_m=site.altitude).update(table).summary()
+                       + summary_lines(table, 'hour'))
+            pages = render_report(config_lines(site, day, args.hora_inicio, args.duracion,
+                                               args.intervalo, len(table['time'])),
+                                  table, summary)
+            save_pages(pages, os.path.join(args.salida, f"sitio{index:03d}_{day}.{args.formato}"))
+            day += timedelta(days=1)
+    if args.perfil:
+        instrumentacion.dump_json(args.perfil)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Reproductor de cuadros con acceso aleatorio.
+
+Reemplaza a la secuencia de cuadros de ``FuncAnimation``: el cuadro actual
+es solo un índice, así que saltar a cualquier cuadro, avanzar, retroceder o
+reanudar desde un cuadro cuesta O(1) sin importar cuántos cuadros tenga la
+simulación.
+
+Los movimientos del deslizador llegan en ráfagas; ``request`` los agrupa
+y en el siguiente momento ocioso dibuja solo el último cuadro pedido.
+
+``scheduler`` es cualquier objeto con la interfaz de temporizadores de Tk
+(``after``, ``after_idle`` y ``after_cancel``), normalmente la ventana raíz.
+"""
+
+
+class FramePlayer:
+    """Controla la reproducción de ``frame_count`` cuadros con ``render(frame)``"""
+
+    def __init__(self, scheduler, render, frame_count, interval_ms=200, on_finish=None):
+        self.scheduler = scheduler
+        self.render = render
+        self.frame_count = frame_count
+        self.interval_ms = interval_ms
+        self.on_finish = on_finish
+        self.frame = 0
+        self.playing = False
+        self._tick_id = None
+        self._idle_id = None
+        self._pending = None
+
+    def _clamp(self, frame):
+        return max(0, min(int(frame), self.frame_count - 1))
+
+    def seek(self, frame):
+        """Dibuja inmediatamente el cuadro indicado"""
+        self._pending = None
+        self.frame = self._clamp(frame)
+        self.render(self.frame)
+
+    def request(self, frame):
+        """Pide un cuadro; las peticiones seguidas se agrupan en un solo dibujo"""
+        self._pending = self._clamp(frame)
+        if self._idle_id is None:
+            self._idle_id = self.scheduler.after_idle(self._flush)
+
+    def _flush(self):
+        self._idle_id = None
+        if self._pending is not None and self._pending != self.frame:
+            self.seek(self._pending)
+        self._pending = None
+
+    def step(self, delta):
+        target = self._clamp(self.frame + delta)
+        if target != self.frame:
+            self.seek(target)
+
+    def play(self):
+        """Reanuda desde el cuadro actual (o desde el inicio si ya terminó)"""
+        if self.playing:
+            return
+        if self.frame >= self.frame_count - 1:
+            self.seek(0)
+        self.playing = True
+        self._tick_id = self.scheduler.after(self.interval_ms, self._tick)
+
+    def pause(self):
+        self.playing = False
+        if self._tick_id is not None:
+            self.scheduler.after_cancel(self._tick_id)
+            self._tick_id = None
+
+    def stop(self):
+        """Detiene la reproducción y descarta peticiones pendientes"""
+        self.pause()
+        if self._idle_id is not None:
+            self.scheduler.after_cancel(self._idle_id)
+            self._idle_id = None
+        self._pending = None
+
+    def _tick(self):
+        self._tick_id = None
+        if not self.playing:
+            return
+        self.seek(self.frame + 1)
+        if self.frame >= self.frame_count - 1:
+            self.playing = False
+            if self.on_finish is not None:
+                self.on_finish()
+            return
+        self._tick_id = self.scheduler.after(self.interval_ms, self._tick)
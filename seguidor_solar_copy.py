@@ -1,25 +1,38 @@
+import importlib.util
+import queue
+import threading
 import tkinter as tk 
 from tkinter import ttk, filedialog, messagebox
 from tkcalendar import DateEntry
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.animation import FuncAnimation
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from mpl_toolkits.mplot3d import art3d
-from datetime import datetime, timedelta
 from pytz import timezone
-from pysolar.solar import get_altitude, get_azimuth
-try:
-    from PIL import Image, ImageDraw, ImageFont
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+from simulacion import (ADAPTIVE_TOLERANCE, QUITO, SimulationResult, TrackingStats,
+                        iter_day_chunks, simulate_adaptive_day)
+from cache_efemerides import EphemerisCache
+import instrumentacion
+from instrumentacion import timed
+from reproductor import FramePlayer
+
+# matplotlib (con mplot3d y el backend TkAgg), Pillow y los módulos de
+# análisis se importan al usar la función que los necesita, así la ventana
+# aparece sin pagar su carga; aquí solo se comprueba que Pillow exista
+PIL_AVAILABLE = importlib.util.find_spec('PIL') is not None
 
 # Configuración geográfica
-latitude = -0.2105367
-longitude = -78.491614
-timezone_local = timezone("America/Guayaquil")
+SITE = QUITO
+latitude = SITE.latitude
+longitude = SITE.longitude
+timezone_local = timezone(SITE.timezone)
+
+# Cálculo en segundo plano: muestras por bloque y periodo de sondeo de la cola
+WORKER_CHUNK_SIZE = 120
+WORKER_POLL_MS = 50
+
+# Periodo de reproducción de la animación (ms)
+ANIMATION_INTERVAL_MS = 200
+
+# Periodo de refresco del panel de perfil (ms)
+PROFILE_REFRESH_MS = 1000
 
 class SolarTrackerApp:
     def __init__(self, root):
@@ -37,31 +50,35 @@ class SolarTrackerApp:
         
         self.create_widgets()
         
+        # Caché de efemérides compartida entre ejecuciones
+        self.ephemeris_cache = EphemerisCache()
+        
         # Variables
         self.animation = None
         self.fig = None
         self.ax = None
         self.canvas = None
-        self.sun_vectors = None
-        self.times = None
+        # Resultado de la simulación actual (columnas de NumPy, ver SimulationResult)
+        self.result = None
         self.current_frame = 0
-        self.panel = None
-        self.elevations = []
-        self.azimuths = []
-        self.pitch_angles = []
-        self.roll_angles = []
+        self.time_labels = None
         self.panel_width = 0.5
         self.panel_height = 0.8
         self.sun_distance = 1.0
-        self.reference_vector = np.array([0, 1, 0])
-        self.angle_text = None
+        self.scene = None
+        
+        # Cálculo en segundo plano
+        self.worker = None
+        self.cancel_event = None
+        self.result_queue = None
+        self.partial_results = None
+        self.path_preview = None
+        self.command_schedule = None
+        self.motion_cost = None
+        self.tolerance = None
+        self.time_unit = 'm'
         
-        # Elementos gráficos de ángulos
-        self.elevation_arc = None
-        self.azimuth_arc = None
-        self.elevation_angle_label = None
-        self.azimuth_angle_label = None
-        self.legend_text = None
+        self.refresh_profile()
 
     def create_widgets(self):
         # === Marco principal izquierdo ===
@@ -101,9 +118,18 @@ class SolarTrackerApp:
         self.interval_spin.set(15)
         self.interval_spin.grid(row=3, column=1, padx=10, pady=8, sticky="w")
         
+        # Paso adaptativo: el intervalo pasa a ser el paso máximo
+        self.adaptive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="📈 Paso adaptativo (°/paso):",
+                        variable=self.adaptive_var).grid(row=4, column=0, sticky="w", pady=8)
+        self.tolerance_spin = ttk.Spinbox(config_frame, from_=0.1, to=10, increment=0.1,
+                                          width=10, font=('Arial', 10))
+        self.tolerance_spin.set(ADAPTIVE_TOLERANCE)
+        self.tolerance_spin.grid(row=4, column=1, padx=10, pady=8, sticky="w")
+        
         # Botones de acción
         buttons_frame = ttk.Frame(config_frame)
-        buttons_frame.grid(row=4, column=0, columnspan=2, pady=15)
+        buttons_frame.grid(row=5, column=0, columnspan=2, pady=15)
         
         self.run_button = ttk.Button(buttons_frame, text="▶️ Calcular y Animar", 
                                     command=self.run_simulation, style='Action.TButton')
@@ -113,6 +139,17 @@ class SolarTrackerApp:
                                      command=self.save_report, style='Action.TButton')
         self.save_button.pack(side="left", padx=5)
         
+        self.export_button = ttk.Button(buttons_frame, text="📦 Exportar Datos", 
+                                       command=self.export_data, style='Action.TButton')
+        self.export_button.pack(side="left", padx=5)
+        
+        self.cancel_button = ttk.Button(buttons_frame, text="⏹️ Cancelar", 
+                                       command=self.cancel_simulation, state="disabled")
+        self.cancel_button.pack(side="left", padx=5)
+        
+        self.progress = ttk.Progressbar(config_frame, orient="horizontal", mode="determinate")
+        self.progress.grid(row=6, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        
         # === Marco de ángulos mejorado ===
         angles_frame = ttk.LabelFrame(left_frame, text="📐 Ángulos Calculados en Tiempo Real", 
                                       padding=15, style='Title.TLabelframe')
@@ -139,13 +176,26 @@ class SolarTrackerApp:
                                     padding=15, style='Title.TLabelframe')
         info_frame.grid(row=2, column=0, padx=5, pady=10, sticky="ew")
         
-        info_text = f"""📍 Ubicación: Quito, Ecuador
+        info_text = f"""📍 Ubicación: {SITE.name}
 🌐 Latitud: {latitude:.6f}°
 🌍 Longitud: {longitude:.6f}°
 ⏰ Zona Horaria: {timezone_local}"""
         
         ttk.Label(info_frame, text=info_text, font=('Arial', 9)).pack()
         
+        # === Marco de perfil de rendimiento (medición opcional) ===
+        profile_frame = ttk.LabelFrame(left_frame, text="⏱️ Perfil de rendimiento",
+                                       padding=15, style='Title.TLabelframe')
+        profile_frame.grid(row=3, column=0, padx=5, pady=10, sticky="ew")
+        
+        self.profile_var = tk.BooleanVar(value=instrumentacion.enabled())
+        ttk.Checkbutton(profile_frame, text="Medir tiempos por etapa", variable=self.profile_var,
+                        command=self.toggle_profiling).pack(anchor="w")
+        self.profile_label = ttk.Label(profile_frame, text="", font=('Consolas', 8),
+                                       justify="left")
+        self.profile_label.pack(anchor="w")
+        ttk.Button(profile_frame, text="Reiniciar", command=self.reset_profiling).pack(anchor="e")
+        
         # === Marco de visualización 3D ===
         self.plot_frame = ttk.LabelFrame(self.root, text="🌅 Visualización 3D - Trayectoria Solar", 
                                         padding=10, style='Title.TLabelframe')
@@ -196,7 +246,7 @@ class SolarTrackerApp:
 
     def save_report(self):
         """Guarda un reporte completo con tabla de datos"""
-        if not hasattr(self, 'times') or self.times is None:
+        if self.result is None:
             messagebox.showwarning("Advertencia", "Primero debe ejecutar la simulación")
             return
             
@@ -206,8 +256,9 @@ class SolarTrackerApp:
             
         # Seleccionar ubicación de guardado
         filename = filedialog.asksaveasfilename(
-            defaultextension=".png",
-            filetypes=[("PNG files", "*.png"), ("JPEG files", "*.jpg"), ("All files", "*.*")],
+            defaultextension=".pdf",
+            filetypes=[("PDF files", "*.pdf"), ("TIFF files", "*.tif *.tiff"),
+                       ("PNG files", "*.png"), ("JPEG files", "*.jpg"), ("All files", "*.*")],
             title="Guardar Reporte del Seguidor Solar"
         )
         
@@ -215,475 +266,321 @@ class SolarTrackerApp:
             return
             
         try:
-            self.generate_report_image(filename)
-            messagebox.showinfo("Éxito", f"Reporte guardado exitosamente en:\n{filename}")
+            written = self.generate_report_image(filename)
+            messagebox.showinfo("Éxito", f"Reporte guardado exitosamente en:\n{filename}"
+                                + (f"\n({len(written)} archivos, uno por página)" if len(written) > 1 else ""))
         except Exception as e:
             messagebox.showerror("Error", f"Error al guardar el reporte:\n{str(e)}")
 
-    def generate_report_image(self, filename):
-        """Genera una imagen con el reporte completo"""
-        # Crear imagen base
-        img_width, img_height = 1200, 1600
-        img = Image.new('RGB', (img_width, img_height), 'white')
-        draw = ImageDraw.Draw(img)
+    def export_data(self):
+        """Exporta la serie completa en formato columnar binario"""
+        if self.result is None:
+            messagebox.showwarning("Advertencia", "Primero debe ejecutar la simulación")
+            return
+            
+        dirname = filedialog.asksaveasfilename(
+            title="Exportar Datos (directorio columnar)",
+            filetypes=[("Directorio columnar", "*")]
+        )
         
+        if not dirname:
+            return
+            
         try:
-            title_font = ImageFont.truetype("arial.ttf", 24)
-            header_font = ImageFont.truetype("arial.ttf", 16)
-            data_font = ImageFont.truetype("arial.ttf", 12)
-        except:
-            title_font = ImageFont.load_default()
-            header_font = ImageFont.load_default()
-            data_font = ImageFont.load_default()
-        
-        y_pos = 30
-        
-        # Título
-        title = "REPORTE DE SEGUIDOR SOLAR 2-DOF"
-        draw.text((img_width//2 - 200, y_pos), title, fill='black', font=title_font)
-        y_pos += 60
-        
-        # Información de configuración
+            from almacenamiento import save_table
+            save_table(self.result.table, dirname)
+            messagebox.showinfo("Éxito", f"Datos exportados exitosamente en:\n{dirname}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al exportar los datos:\n{str(e)}")
+
+    @timed('generate_report_image')
+    def generate_report_image(self, filename):
+        """Genera el reporte completo, paginado si la tabla no cabe en una página"""
         config_info = [
             f"Fecha de simulacion: {self.date_entry.get()}",
             f"Hora de inicio: {self.hour_spin.get()}:00",
             f"Duracion: {self.duration_spin.get()} horas",
-            f"Intervalo: {self.interval_spin.get()} minutos",
-            f"Ubicacion: Quito, Ecuador ({latitude:.4f}°, {longitude:.4f}°)",
+            self.interval_description(),
+            f"Ubicacion: {SITE.name} ({latitude:.4f}°, {longitude:.4f}°)",
             f"Zona horaria: {timezone_local}",
-            f"Total de mediciones: {len(self.times)}"
+            f"Total de mediciones: {len(self.result)}"
         ]
-        
-        for info in config_info:
-            draw.text((50, y_pos), info, fill='black', font=header_font)
-            y_pos += 25
-        
-        y_pos += 20
-        
-        # Encabezado de tabla
-        draw.text((50, y_pos), "DATOS DE SEGUIMIENTO SOLAR POR HORA", fill='black', font=header_font)
-        y_pos += 40
-        
-        # Encabezados de columna
-        headers = ["Hora", "Elevacion (°)", "Azimuth (°)", "Pitch (°)", "Roll (°)", "Observaciones"]
-        col_widths = [80, 100, 100, 80, 80, 200]
-        x_positions = [50]
-        for width in col_widths[:-1]:
-            x_positions.append(x_positions[-1] + width)
-        
-        # Dibujar línea de encabezado
-        for i, (header, x_pos) in enumerate(zip(headers, x_positions)):
-            draw.text((x_pos, y_pos), header, fill='black', font=header_font)
-        
-        y_pos += 30
-        
-        # Línea separadora
-        draw.line([(40, y_pos), (img_width-40, y_pos)], fill='black', width=2)
-        y_pos += 15
-        
-        # Datos por hora (filtrar para mostrar solo datos cada hora)
-        hourly_data = self.get_hourly_data()
-        
-        for i, data in enumerate(hourly_data):
-            if y_pos > img_height - 100:  # Si nos quedamos sin espacio
-                break
-                
-            time_str = data['time'].strftime("%H:%M")
-            elevation = f"{data['elevation']:.1f}"
-            azimuth = f"{data['azimuth']:.1f}"
-            pitch = f"{data['pitch']:.1f}"
-            roll = f"{data['roll']:.1f}"
-            
-            # Observaciones basadas en los valores
-            obs = self.get_observation(data['elevation'], data['azimuth'])
-            
-            row_data = [time_str, elevation, azimuth, pitch, roll, obs]
-            
-            # Alternar color de fila para mejor legibilidad
-            if i % 2 == 1:
-                draw.rectangle([(40, y_pos-5), (img_width-40, y_pos+20)], 
-                              fill='#f0f0f0', outline=None)
-            
-            for j, (text, x_pos) in enumerate(zip(row_data, x_positions)):
-                if j == len(row_data) - 1:  # Observaciones
-                    # Texto más pequeño para observaciones
-                    draw.text((x_pos, y_pos), text[:30] + "..." if len(text) > 30 else text, 
-                             fill='black', font=data_font)
-                else:
-                    draw.text((x_pos, y_pos), text, fill='black', font=data_font)
-            
-            y_pos += 25
-        
-        # Resumen estadístico
-        y_pos += 30
-        draw.text((50, y_pos), "RESUMEN ESTADISTICO", fill='black', font=header_font)
-        y_pos += 30
-        
-        stats = self.calculate_statistics()
-        for stat in stats:
-            draw.text((50, y_pos), stat, fill='black', font=data_font)
-            y_pos += 20
-        
-        # Guardar imagen
-        img.save(filename, quality=95)
-
-    def get_hourly_data(self):
-        """Obtiene datos filtrados por hora"""
-        hourly_data = []
-        current_hour = None
-        
-        for i, time in enumerate(self.times):
-            if current_hour != time.hour:
-                current_hour = time.hour
-                hourly_data.append({
-                    'time': time,
-                    'elevation': self.elevations[i],
-                    'azimuth': self.azimuths[i],
-                    'pitch': self.pitch_angles[i],
-                    'roll': self.roll_angles[i]
-                })
-        
-        return hourly_data
-
-    def get_observation(self, elevation, azimuth):
-        """Genera observaciones basadas en los ángulos"""
-        if elevation < 10:
-            return "Sol bajo en horizonte"
-        elif elevation > 70:
-            return "Sol en cenit - maxima radiacion"
-        elif 30 <= elevation <= 70:
-            return "Condiciones optimas"
-        elif azimuth > 270 or azimuth < 90:
-            return "Sol hacia el este"
-        elif 90 <= azimuth <= 270:
-            return "Sol hacia el oeste"
-        else:
-            return "Seguimiento normal"
+        from reporte import render_report, save_pages
+        pages = render_report(config_info, self.result.table, self.calculate_statistics(),
+                              self.time_unit)
+        return save_pages(pages, filename)
+
+    def interval_description(self):
+        if self.tolerance is None:
+            return f"Intervalo: {self.interval_spin.get()} minutos"
+        return (f"Intervalo: adaptativo ({self.tolerance:g}°/paso, "
+                f"maximo {self.interval_spin.get()} minutos)")
 
     def calculate_statistics(self):
         """Calcula estadísticas del seguimiento"""
-        stats = []
-        if self.elevations:
-            max_elev_idx = self.elevations.index(max(self.elevations))
-            stats.extend([
-                f"• Elevacion maxima: {max(self.elevations):.1f}° a las {self.times[max_elev_idx].strftime('%H:%M')}",
-                f"• Elevacion minima: {min(self.elevations):.1f}°",
-                f"• Elevacion promedio: {np.mean(self.elevations):.1f}°",
-                f"• Rango de azimuth: {min(self.azimuths):.1f}° a {max(self.azimuths):.1f}°",
-                f"• Tiempo de seguimiento: {len(self.times)} mediciones",
-                f"• Eficiencia estimada: {self.calculate_efficiency():.1f}%"
-            ])
-        return stats
-
-    def calculate_efficiency(self):
-        """Calcula eficiencia estimada basada en ángulos de elevación"""
-        if not self.elevations:
-            return 0
-        
-        # Eficiencia basada en elevaciones > 10°
-        good_angles = [e for e in self.elevations if e > 10]
-        return (len(good_angles) / len(self.elevations)) * 100
+        if self.result is None:
+            return []
+        from agregacion import summary_lines
+        from energia import EnergyYield
+        from planificador import cost_summary
+        from sombreado import DEFAULT_FIELD, ShadingStats
+        table = self.result.table
+        energy = EnergyYield(SITE.latitude, SITE.altitude).update(table)
+        # Campo de referencia con el panel de la escena
+        field = DEFAULT_FIELD._replace(panel_width=self.panel_width,
+                                       panel_height=self.panel_height)
+        lines = (TrackingStats().update(table).summary() + energy.summary()
+                 + ShadingStats(field, SITE.altitude).update(table).summary())
+        if self.motion_cost is not None:
+            lines += cost_summary(self.motion_cost, len(self.result))
+        # Resumen por hora local de la capa de agregación
+        return lines + summary_lines(table, 'hour')
 
     def clean_previous_animation(self):
         if self.animation:
-            self.animation.event_source.stop()
+            self.animation.stop()
+        if self.scene:
+            self.scene.disconnect()
         if self.canvas:
             self.canvas.get_tk_widget().destroy()
-        if self.fig:
-            plt.close(self.fig)
         self.animation = None
         self.canvas = None
         self.fig = None
         self.ax = None
-        self.panel = None
-        self.angle_text = None
-        self.elevation_arc = None
-        self.azimuth_arc = None
-        self.elevation_angle_label = None
-        self.azimuth_angle_label = None
-        self.legend_text = None
-
-    def calculate_sun_position(self, date, hour_start, duration_hours, time_step_minutes):
-        start_time = timezone_local.localize(datetime.combine(date, datetime.min.time()) + timedelta(hours=hour_start))
-        times, elevations, azimuths = [], [], []
-        pitch_angles, roll_angles = [], []
-        for i in range(0, duration_hours * 60, time_step_minutes):
-            t = start_time + timedelta(minutes=i)
-            elevation = get_altitude(latitude, longitude, t)
-            azimuth = get_azimuth(latitude, longitude, t)
-            pitch = 90 - elevation
-            roll = azimuth
-            times.append(t)
-            elevations.append(elevation)
-            azimuths.append(azimuth)
-            pitch_angles.append(pitch)
-            roll_angles.append(roll)
-        elev_rad = np.radians(elevations)
-        azim_rad = np.radians(azimuths)
-        sun_vectors = np.array([
-            np.cos(elev_rad) * np.sin(azim_rad),
-            np.cos(elev_rad) * np.cos(azim_rad),
-            np.sin(elev_rad)
-        ]).T
-        return times, sun_vectors, elevations, azimuths, pitch_angles, roll_angles
-
-    def create_panel_vertices(self, normal_vector):
-        normal = normal_vector / np.linalg.norm(normal_vector)
-        if np.allclose(np.abs(normal), [0, 0, 1]):
-            u = np.array([1, 0, 0])
-        else:
-            u = np.cross(self.reference_vector, normal)
-            u = u / np.linalg.norm(u)
-        v = np.cross(normal, u)
-        v = v / np.linalg.norm(v)
-        hw = self.panel_width / 2
-        hh = self.panel_height / 2
-        return [[hh * u + hw * v, -hh * u + hw * v, -hh * u - hw * v, hh * u - hw * v]]
-
-    def create_angle_arc(self, start_vec, end_vec, center=np.array([0,0,0]), radius=0.3, num_points=20):
-        start_vec = start_vec / np.linalg.norm(start_vec)
-        end_vec = end_vec / np.linalg.norm(end_vec)
-        normal = np.cross(start_vec, end_vec)
-        if np.linalg.norm(normal) == 0:
-            normal = np.array([0,0,1])
-        else:
-            normal = normal / np.linalg.norm(normal)
-        u = start_vec
-        v = np.cross(normal, u)
-        v = v / np.linalg.norm(v)
-        angle_start = 0
-        angle_end = np.arccos(np.clip(np.dot(start_vec, end_vec), -1.0, 1.0))
-        angles = np.linspace(angle_start, angle_end, num_points)
-        arc = np.array([center + radius * (np.cos(a) * u + np.sin(a) * v) for a in angles])
-        return arc
+        self.scene = None
+        self.path_preview = None
 
     def init_animation(self):
-        sun_path = self.sun_vectors * self.sun_distance
-        self.ax.plot(sun_path[:, 0], sun_path[:, 1], sun_path[:, 2],
-                     'y-', alpha=0.5, marker='o', markersize=3, label="Trayectoria solar")
-        panel_verts = self.create_panel_vertices(self.sun_vectors[0])
-        self.panel = Poly3DCollection(panel_verts, color='green', alpha=0.8) 
-        self.ax.add_collection3d(self.panel)
-        self.ax.set_xlim([-1.2, 1.2])
-        self.ax.set_ylim([-1.2, 1.2])
-        self.ax.set_zlim([0, 1.5])
-        self.ax.set_xlabel("Este-Oeste")
-        self.ax.set_ylabel("Norte-Sur")
-        self.ax.set_zlabel("Altura")
-
-        self.legend_text = self.ax.text2D(
-            0.05, 0.05,
-            "● = Elevacion (rojo)\n● = Azimuth (azul)",
-            transform=self.ax.transAxes, fontsize=9, color='black',
-            bbox=dict(facecolor='white', alpha=0.8, edgecolor='gray')
-        )
-
-        self.ax.legend()
-        return self.panel,
-
+        from escena import TrackerScene
+        table = self.result.table
+        self.time_labels = self.result.time_labels(self.time_unit)
+        self.scene = TrackerScene(self.ax, table['sun_vector'], table['elevation'],
+                                  table['azimuth'], table['pitch'], table['roll'],
+                                  self.time_labels,
+                                  self.panel_width, self.panel_height, self.sun_distance)
+        artists = self.scene.build()
+        self.scene.update(0)
+        return artists
+
+    @timed('update_animation')
     def update_animation(self, frame):
         self.current_frame = frame
-        normal = self.sun_vectors[frame]
-        elevation = self.elevations[frame]
-        azimuth = self.azimuths[frame]
-
-        # Actualizar panel
-        self.panel.set_verts(self.create_panel_vertices(normal))
-
-        # Limpiar arcos anteriores
-        if self.elevation_arc is not None:
-            self.elevation_arc.remove()
-            self.elevation_arc = None
-        if self.azimuth_arc is not None:
-            self.azimuth_arc.remove()
-            self.azimuth_arc = None
-        if self.elevation_angle_label is not None:
-            self.elevation_angle_label.remove()
-            self.elevation_angle_label = None
-        if self.azimuth_angle_label is not None:
-            self.azimuth_angle_label.remove()
-            self.azimuth_angle_label = None
-
-        # Limpiar otros elementos
-        for artist in self.ax.lines[1:]:
-            artist.remove()
-        for artist in self.ax.collections[1:]:
-            if artist != self.panel:
-                artist.remove()
-
-        # Dibujar vector solar y sol
-        self.ax.quiver(0, 0, 0, normal[0], normal[1], normal[2],
-                       color='orange', length=1.2, arrow_length_ratio=0.1)
-        self.ax.scatter(normal[0] * self.sun_distance, normal[1] * self.sun_distance,
-                        normal[2] * self.sun_distance,
-                        color='yellow', s=200, edgecolor='orange', zorder=10)
-
-        # Arco de elevación (rojo)
-        proj_horizontal = np.array([normal[0], normal[1], 0])
-        if np.linalg.norm(proj_horizontal) > 0.01 and elevation > 5:
-            arc_elev = self.create_angle_arc(proj_horizontal, normal, radius=0.3, num_points=15)
-            self.elevation_arc = art3d.Line3DCollection([arc_elev], colors=['red'], linewidths=2)
-            self.ax.add_collection3d(self.elevation_arc)
-            mid_point = arc_elev[len(arc_elev)//2]
-            self.elevation_angle_label = self.ax.text(
-                mid_point[0], mid_point[1], mid_point[2],
-                f"{elevation:.1f}°", fontsize=8, color='red', ha='center', va='center'
-            )
+        elevation, azimuth, pitch, roll = self.result.angles(frame)
 
-        # Arco de azimuth (azul)
-        north = np.array([0, 1, 0])
-        proj_norm = np.array([normal[0], normal[1], 0])
-        if np.linalg.norm(proj_norm) > 0.01 and abs(azimuth) > 5:
-            arc_azim = self.create_angle_arc(north, proj_norm, radius=0.2, num_points=15)
-            self.azimuth_arc = art3d.Line3DCollection([arc_azim], colors=['blue'], linewidths=2)
-            self.ax.add_collection3d(self.azimuth_arc)
-            mid_point = arc_azim[len(arc_azim)//2]
-            self.azimuth_angle_label = self.ax.text(
-                mid_point[0], mid_point[1], mid_point[2],
-                f"{azimuth:.1f}°", fontsize=8, color='blue', ha='center', va='center'
-            )
-
-        # Texto de ángulos (esquina superior)
-        if self.angle_text:
-            self.angle_text.remove()
-        self.angle_text = self.ax.text2D(
-            0.05, 0.95,
-            f"Elevacion: {elevation:.2f}°\n"
-            f"Azimuth: {azimuth:.2f}°\n"
-            f"Pitch: {self.pitch_angles[frame]:.2f}°\n"
-            f"Roll: {self.roll_angles[frame]:.2f}°",
-            transform=self.ax.transAxes, fontsize=10, verticalalignment='top',
-            bbox=dict(facecolor='white', alpha=0.8)
-        )
+        # Solo cambian los datos de los artistas; el fondo se restaura con blit
+        self.scene.render(frame)
 
-        self.ax.set_title(f"Posicion solar a las {self.times[frame].strftime('%H:%M')}")
         self.elevation_label.config(text=f"{elevation:.2f}°")
         self.azimuth_label.config(text=f"{azimuth:.2f}°")
-        self.pitch_label.config(text=f"{self.pitch_angles[frame]:.2f}°")
-        self.roll_label.config(text=f"{self.roll_angles[frame]:.2f}°")
+        self.pitch_label.config(text=f"{pitch:.2f}°")
+        self.roll_label.config(text=f"{roll:.2f}°")
         self.slider.set(frame)
-        self.time_label.config(text=self.times[frame].strftime("%H:%M"))
+        self.time_label.config(text=self.time_labels[frame])
 
-        self.canvas.draw_idle()
-
-        # Detener animación al final
-        if frame == len(self.times) - 1:
-            if self.animation and self.animation.event_source:
-                self.animation.event_source.stop()
-            self.playing = False
-            self.play_button.config(text="▶️ Play")
-
-        return self.panel,
+    def playback_finished(self):
+        """Se llama cuando la reproducción llega al último cuadro"""
+        self.playing = False
+        self.play_button.config(text="▶️ Play")
 
     def run_simulation(self):
         try:
+            self.cancel_simulation()
             self.clean_previous_animation()
             date = self.date_entry.get_date()
             hour_start = int(self.hour_spin.get())
             duration = int(self.duration_spin.get())
             interval = int(self.interval_spin.get())
-            (self.times, self.sun_vectors, self.elevations,
-             self.azimuths, self.pitch_angles, self.roll_angles) = self.calculate_sun_position(
-                date, hour_start, duration, interval)
-
-            self.fig = plt.Figure(figsize=(12, 8), dpi=100)
+            tolerance = float(self.tolerance_spin.get()) if self.adaptive_var.get() else None
+            if tolerance is not None and tolerance <= 0:
+                raise ValueError("La tolerancia del paso adaptativo debe ser positiva")
+            self.tolerance = tolerance
+            # Con paso adaptativo hay muestras a menos de un minuto entre sí
+            self.time_unit = 'm' if tolerance is None else 's'
+            self.result = None
+            self.partial_results = []
+            self.progress.config(maximum=len(range(0, duration * 60, interval)), value=0)
+
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from matplotlib.figure import Figure
+            self.fig = Figure(figsize=(12, 8), dpi=100)
             self.ax = self.fig.add_subplot(111, projection='3d')
             self.canvas = FigureCanvasTkAgg(self.fig, self.plot_frame)
+            # draw_idle solo programa el dibujo; el costo real está en draw
+            self.canvas.draw_idle = timed('draw_idle')(self.canvas.draw_idle)
+            self.canvas.draw = timed('canvas_draw')(self.canvas.draw)
             self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-            self.animation = FuncAnimation(
-                self.fig, self.update_animation,
-                frames=len(self.times),
-                init_func=self.init_animation,
-                interval=200, blit=False, repeat=False
-            )
-
-            self.slider.config(to=len(self.times) - 1)
-            self.slider.set(0)
-            self.current_frame = 0
-            self.playing = False
-            self.play_button.config(text="▶️ Play")
-            self.time_label.config(text="--:--")
+            # Vista previa de la trayectoria mientras llegan los resultados
+            self.path_preview, = self.ax.plot([], [], [], 'y-', alpha=0.5, marker='o', markersize=3)
+            self.ax.set_xlim([-1.2, 1.2])
+            self.ax.set_ylim([-1.2, 1.2])
+            self.ax.set_zlim([0, 1.5])
+            self.ax.set_title("Calculando...")
             self.canvas.draw_idle()
 
+            self.cancel_event = threading.Event()
+            self.result_queue = queue.Queue()
+            self.worker = threading.Thread(
+                target=self.compute_worker,
+                args=((date, hour_start, duration, interval), tolerance, self.cancel_event,
+                      self.result_queue),
+                daemon=True
+            )
+            self.worker.start()
+            self.cancel_button.config(state="normal")
+            self.root.after(WORKER_POLL_MS, self.poll_worker, self.result_queue)
+
         except Exception as e:
             import traceback
             traceback.print_exc()
             messagebox.showerror("Error", f"Error en la simulación:\n{str(e)}")
 
+    def compute_worker(self, params, tolerance, cancel_event, results):
+        """Calcula la simulación en un hilo aparte (sin tocar widgets de Tk)"""
+        try:
+            if tolerance is None:
+                chunks = iter_day_chunks(*params, SITE, self.ephemeris_cache,
+                                         chunk_size=WORKER_CHUNK_SIZE)
+            else:
+                # La línea de tiempo adaptativa se refina completa y luego se
+                # entrega en bloques como la uniforme
+                table = simulate_adaptive_day(*params, SITE, tolerance)
+                total = len(table['time'])
+                results.put(('total', total))
+                chunks = ({name: values[i:i + WORKER_CHUNK_SIZE] for name, values in table.items()}
+                          for i in range(0, total, WORKER_CHUNK_SIZE))
+            for chunk in chunks:
+                if cancel_event.is_set():
+                    results.put(('cancelled', None))
+                    return
+                results.put(('chunk', chunk))
+            results.put(('done', None))
+        except Exception as e:
+            results.put(('error', e))
+
+    def poll_worker(self, results):
+        """Recoge en el hilo de Tk los bloques que entrega el hilo de cálculo"""
+        if results is not self.result_queue:
+            return
+        received = False
+        while True:
+            try:
+                kind, payload = results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'chunk':
+                self.partial_results.append(payload)
+                received = True
+            elif kind == 'total':
+                self.progress.config(maximum=payload)
+            elif kind == 'done':
+                self.finish_simulation()
+                return
+            elif kind == 'error':
+                self.result_queue = None
+                self.cancel_button.config(state="disabled")
+                messagebox.showerror("Error", f"Error en la simulación:\n{str(payload)}")
+                return
+            else:
+                return
+        if received:
+            self.show_partial_results()
+        self.root.after(WORKER_POLL_MS, self.poll_worker, results)
+
+    def show_partial_results(self):
+        """Dibuja la parte de la trayectoria calculada hasta ahora"""
+        from escena import path_level_of_detail
+        vectors = np.concatenate([c['sun_vector'] for c in self.partial_results])
+        path, markers = path_level_of_detail(vectors, self.ax, self.sun_distance)
+        self.path_preview.set_data_3d(path[:, 0], path[:, 1], path[:, 2])
+        self.path_preview.set_markevery(markers)
+        self.progress.config(value=len(vectors))
+        self.canvas.draw_idle()
+
+    def finish_simulation(self):
+        """Publica el resultado completo y prepara la animación"""
+        self.result = SimulationResult.from_chunks(self.partial_results, SITE)
+        from planificador import DEFAULT_POLICY, plan
+        # Programa reducido de comandos para los actuadores
+        self.command_schedule, self.motion_cost = plan(self.result.table, DEFAULT_POLICY)
+        self.partial_results = None
+        self.result_queue = None
+        self.cancel_button.config(state="disabled")
+        self.progress.config(value=len(self.result))
+        self.path_preview.remove()
+        self.path_preview = None
+        self.ax.set_title("")
+
+        self.init_animation()
+        self.animation = FramePlayer(self.root, self.update_animation, len(self.result),
+                                     ANIMATION_INTERVAL_MS, on_finish=self.playback_finished)
+
+        self.slider.config(to=len(self.result) - 1)
+        self.slider.set(0)
+        self.current_frame = 0
+        self.playing = False
+        self.play_button.config(text="▶️ Play")
+        self.time_label.config(text="--:--")
+        self.canvas.draw_idle()
+
+    def cancel_simulation(self):
+        """Cancela el cálculo en curso, si lo hay"""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.result_queue = None
+        self.partial_results = None
+        self.cancel_button.config(state="disabled")
+
     def toggle_play(self):
-        if not self.animation or not self.animation.event_source:
+        if not self.animation:
             return
         if self.playing:
-            self.animation.event_source.stop()
+            self.animation.pause()
             self.play_button.config(text="▶️ Play")
         else:
-            # Reiniciar secuencia y avanzar hasta el frame actual
-            self.animation.frame_seq = self.animation.new_frame_seq()
-            for _ in range(self.current_frame):
-                try:
-                    next(self.animation.frame_seq)
-                except StopIteration:
-                    break
-            self.animation.event_source.start()
+            self.animation.play()
             self.play_button.config(text="⏸️ Pause")
         self.playing = not self.playing
 
     def step_forward(self):
-        if self.sun_vectors is None: return
-        if self.current_frame < len(self.sun_vectors) - 1:
-            self.current_frame += 1
-            self.update_animation(self.current_frame)
-            # Sincronizar animación
-            if self.animation and self.animation.event_source:
-                self.animation.frame_seq = self.animation.new_frame_seq()
-                for _ in range(self.current_frame):
-                    try:
-                        next(self.animation.frame_seq)
-                    except StopIteration:
-                        break
-            self.canvas.draw_idle()
+        if not self.animation: return
+        self.animation.step(1)
 
     def step_back(self):
-        if self.sun_vectors is None: return
-        if self.current_frame > 0:
-            self.current_frame -= 1
-            self.update_animation(self.current_frame)
-            if self.animation and self.animation.event_source:
-                self.animation.frame_seq = self.animation.new_frame_seq()
-                for _ in range(self.current_frame):
-                    try:
-                        next(self.animation.frame_seq)
-                    except StopIteration:
-                        break
-            self.canvas.draw_idle()
+        if not self.animation: return
+        self.animation.step(-1)
 
     def slider_moved(self, val):
-        if self.sun_vectors is None: return
+        if not self.animation: return
         frame = int(float(val))
         if frame != self.current_frame:
-            self.current_frame = frame
-            self.update_animation(frame)
-            if self.animation and self.animation.event_source:
-                self.animation.frame_seq = self.animation.new_frame_seq()
-                for _ in range(self.current_frame):
-                    try:
-                        next(self.animation.frame_seq)
-                    except StopIteration:
-                        break
-            self.canvas.draw_idle()
+            # Las ráfagas del deslizador se agrupan: solo se dibuja el último cuadro
+            self.animation.request(frame)
+
+    def toggle_profiling(self):
+        instrumentacion.enable(self.profile_var.get())
+        self.refresh_profile(reschedule=False)
+
+    def reset_profiling(self):
+        instrumentacion.reset()
+        self.refresh_profile(reschedule=False)
+
+    def refresh_profile(self, reschedule=True):
+        """Muestra el resumen de tiempos por etapa (cada PROFILE_REFRESH_MS)"""
+        if not instrumentacion.enabled():
+            text = "Medición desactivada"
+        else:
+            text = "\n".join(instrumentacion.summary_lines()) or "Sin mediciones todavía"
+        self.profile_label.config(text=text)
+        if reschedule:
+            self.root.after(PROFILE_REFRESH_MS, self.refresh_profile)
 
     def reiniciar_animacion(self):
-        if self.sun_vectors is None: return
-        self.current_frame = 0
-        self.update_animation(0)
-        if self.animation and self.animation.event_source:
-            self.animation.event_source.stop()
-            self.animation.frame_seq = self.animation.new_frame_seq()
+        if not self.animation: return
+        self.animation.pause()
+        self.animation.seek(0)
         self.playing = False
         self.play_button.config(text="▶️ Play")
-        self.slider.set(0)
-        self.time_label.config(text=self.times[0].strftime("%H:%M"))
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,380 @@
+"""Servidor asyncio de consignas pitch/roll para los controladores del campo.
+
+Sirve por HTTP/1.1 (con conexiones persistentes) la consigna actual, o la de
+cualquier instante, de cada seguidor de varios sitios::
+
+    GET /setpoint?site=<sitio>&tracker=<seguidor>[&time=<instante>]
+
+    {"site": "Quito, Ecuador", "tracker": "A-17", "time": "2024-03-21T17:00:00Z",
+     "pitch": 5.2953, "roll": 80.9283, "elevation": 84.7047, "azimuth": 80.9283}
+
+``site`` es el nombre del sitio o su posición en la lista; ``time`` es un
+instante UTC en ISO 8601 o en segundos Unix (por defecto, ahora). Todos los
+seguidores 2-DOF de un sitio reciben la misma consigna (salvo con
+retroseguimiento, que también es común al campo); ``tracker`` identifica al
+controlador en la respuesta. ``GET /sites`` lista los sitios y ``GET /stats``
+devuelve los contadores de solicitudes y lotes.
+
+Las solicitudes que llegan en la misma vuelta del bucle de eventos se
+acumulan y se resuelven juntas: una consulta vectorizada por sitio a su
+``interpolacion.EphemerisGrid``, que cubre las próximas horas y se mantiene
+caliente en memoria (se renueva al acercarse a su final). Los instantes
+fuera de la rejilla se calculan directamente con ``efemerides.sun_position``
+en el mismo lote.
+
+Uso::
+
+    python servidor.py --sitios sitios.csv --puerto 8765
+
+    # Prueba de carga con el cliente local incluido (servidor en el mismo proceso)
+    python servidor.py --prueba 20000 --conexiones 200
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from efemerides import sun_position, sun_vectors
+from interpolacion import EphemerisGrid
+from simulacion import QUITO, tracker_angles
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Rejilla caliente por sitio: desde un poco antes de ahora hasta GRID_HOURS
+# después, con nodos de 1 minuto (error < 1e-4° con el sol sobre el horizonte)
+GRID_HOURS = 24
+GRID_MARGIN_SECONDS = 3600
+GRID_STEP_SECONDS = 60
+
+MAX_REQUEST_LINE = 8192
+
+# Instantes admitidos (segundos Unix): años 1 a 9999, representables como datetime64[s]
+MIN_EPOCH = int(np.datetime64('0001-01-01T00:00:00', 's').astype(np.int64))
+MAX_EPOCH = int(np.datetime64('9999-12-31T23:59:59', 's').astype(np.int64))
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            431: 'Request Header Fields Too Large'}
+
+
+def parse_time(value):
+    """Instante UTC en segundos Unix desde ISO 8601 o segundos Unix"""
+    try:
+        epoch = float(value)
+    except ValueError:
+        text = value.strip()
+        if text.endswith('Z'):
+            text = text[:-1]
+        try:
+            epoch = float(np.datetime64(text, 's').astype(np.int64))
+        except ValueError:
+            raise ValueError(f"Instante no válido: {value}") from None
+    if not MIN_EPOCH <= epoch <= MAX_EPOCH:  # también descarta nan e inf
+        raise ValueError(f"Instante fuera de rango (años 1 a 9999): {value}")
+    return epoch
+
+
+def format_time(epoch):
+    return f"{np.datetime64(int(round(epoch)), 's')}Z"
+
+
+class SetpointService:
+    """Resuelve consignas por lotes con una rejilla de efemérides por sitio"""
+
+    def __init__(self, sites, field=None, clock=time.time):
+        """``field`` (un ``sombreado.FieldLayout``) activa el retroseguimiento"""
+        self.sites = list(sites)
+        self.index = {}
+        for i, site in enumerate(self.sites):
+            self.index[str(i)] = i
+            self.index[site.name] = i
+        self.field = field
+        self.clock = clock
+        self.grids = {}
+        self.pending = []
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    def site_index(self, site_id):
+        try:
+            return self.index[site_id]
+        except KeyError:
+            raise KeyError(f"Sitio desconocido: {site_id}") from None
+
+    def grid(self, site_index, now):
+        """Rejilla caliente del sitio, renovada si ``now`` se acerca a su final"""
+        grid = self.grids.get(site_index)
+        if grid is None or not grid.first <= now <= grid.last - GRID_MARGIN_SECONDS:
+            grid = EphemerisGrid(self.sites[site_index], now - GRID_MARGIN_SECONDS,
+                                 now + GRID_HOURS * 3600, GRID_STEP_SECONDS)
+            self.grids[site_index] = grid
+        return grid
+
+    def compute(self, site_index, times, now=None):
+        """Elevación, azimuth, pitch y roll (grados) de un sitio en ``times``"""
+        site = self.sites[site_index]
+        times = np.asarray(times, dtype=np.float64)
+        grid = self.grid(site_index, self.clock() if now is None else now)
+        inside = (times >= grid.first) & (times <= grid.last)
+        elevations = np.empty(len(times))
+        azimuths = np.empty(len(times))
+        if inside.any():
+            elevations[inside], azimuths[inside] = grid.position(times[inside])
+        if not inside.all():
+            outside = ~inside
+            elevations[outside], azimuths[outside] = sun_position(times[outside], site.latitude,
+                                                                  site.longitude)
+        pitch, roll = tracker_angles(elevations, azimuths)
+        if self.field is not None:
+            from sombreado import backtrack_pitch
+            sun = sun_vectors(elevations, azimuths)
+            day = sun[:, 2] > 0
+            pitch[day] = backtrack_pitch(sun[day], pitch[day], roll[day], self.field)
+        return elevations, azimuths, pitch, roll
+
+    def setpoint(self, site_index, tracker, when=None):
+        """Agrega una solicitud al lote de esta vuelta del bucle; devuelve un futuro"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self.pending:
+            loop.call_soon(self.flush)
+        self.pending.append((site_index, tracker, when, future))
+        return future
+
+    def flush(self):
+        """Resuelve todas las solicitudes pendientes con un cálculo por sitio"""
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        self.requests += len(batch)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        now = self.clock()
+        sites = np.array([request[0] for request in batch])
+        times = np.array([now if request[2] is None else request[2] for request in batch])
+        for site_index in np.unique(sites):
+            members = np.flatnonzero(sites == site_index)
+            try:
+                columns = self.compute(int(site_index), times[members], now)
+            except Exception as e:
+                for i in members:
+                    if not batch[i][3].done():
+                        batch[i][3].set_exception(e)
+                continue
+            name = self.sites[site_index].name
+            for i, elevation, azimuth, pitch, roll in zip(members, *(c.tolist() for c in columns)):
+                _, tracker, _, future = batch[i]
+                if future.done():  # el cliente pudo cerrar la conexión
+                    continue
+                # Un fallo al armar una respuesta solo afecta a esa solicitud
+                try:
+                    result = {
+                        'site': name, 'tracker': tracker, 'time': format_time(times[i]),
+                        'pitch': round(pitch, 4), 'roll': round(roll, 4),
+                        'elevation': round(elevation, 4), 'azimuth': round(azimuth, 4),
+                    }
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+
+    def stats(self):
+        return {'requests': self.requests, 'batches': self.batches,
+                'largest_batch': self.largest_batch,
+                'mean_batch': self.requests / self.batches if self.batches else 0.0,
+                'warm_sites': len(self.grids)}
+
+
+class SetpointServer:
+    """Protocolo HTTP/1.1 mínimo sobre ``asyncio`` para ``SetpointService``"""
+
+    def __init__(self, service):
+        self.service = service
+
+    async def route(self, method, target):
+        """Devuelve (estado, cuerpo) de una solicitud"""
+        if method != 'GET':
+            return 405, {'error': "Solo se admite GET"}
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == '/setpoint':
+            try:
+                site_index = self.service.site_index(query.get('site', '0'))
+                when = parse_time(query['time']) if 'time' in query else None
+            except KeyError as e:
+                return 404, {'error': e.args[0]}
+            except ValueError as e:
+                return 400, {'error': str(e)}
+            return 200, await self.service.setpoint(site_index, query.get('tracker', ''), when)
+        if url.path == '/sites':
+            return 200, [{'id': i, 'name': s.name, 'latitude': s.latitude,
+                          'longitude': s.longitude} for i, s in enumerate(self.service.sites)]
+        if url.path == '/stats':
+            return 200, self.service.stats()
+        return 404, {'error': f"Ruta desconocida: {url.path}"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    keep_alive = True
+                    while True:  # cabeceras; solo interesa Connection
+                        header = await reader.readline()
+                        if header in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = header.decode('latin-1').partition(':')
+                        if (name.strip().lower() == 'connection'
+                                and value.strip().lower() == 'close'):
+                            keep_alive = False
+                except ValueError:  # línea más larga que MAX_REQUEST_LINE (LimitOverrunError)
+                    await self.respond(writer, 431, {'error': "Línea demasiado larga"}, False)
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    status, body, keep_alive = 400, {'error': "Solicitud mal formada"}, False
+                else:
+                    keep_alive = keep_alive and version == 'HTTP/1.1'
+                    try:
+                        status, body = await self.route(method, target)
+                    except Exception as e:
+                        status, body = 400, {'error': str(e)}
+                await self.respond(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer, status, body, keep_alive):
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+            + payload)
+        await writer.drain()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        # El límite del flujo acota cada línea: readline lanza ValueError si se supera
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_REQUEST_LINE)
+
+
+async def fetch_setpoints(host, port, paths, connections=100):
+    """Cliente local de prueba: reparte ``paths`` entre conexiones persistentes.
+
+    Devuelve la lista de respuestas (estado, cuerpo JSON) en el orden de
+    ``paths``.
+    """
+    results = [None] * len(paths)
+
+    async def worker(indices):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in indices:
+                writer.write(f"GET {paths[i]} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    if name.lower() == 'content-length':
+                        length = int(value)
+                results[i] = (status, json.loads(await reader.readexactly(length)))
+        finally:
+            writer.close()
+
+    connections = max(1, min(connections, len(paths)))
+    await asyncio.gather(*(worker(range(c, len(paths), connections)) for c in range(connections)))
+    return results
+
+
+async def load_test(service, requests, connections, trackers=1000):
+    """Levanta el servidor en un puerto libre y lo carga con el cliente local"""
+    server = await SetpointServer(service).start(DEFAULT_HOST, 0)
+    port = server.sockets[0].getsockname()[1]
+    paths = [f"/setpoint?site={i % len(service.sites)}&tracker=T{i % trackers}"
+             for i in range(requests)]
+    start = time.perf_counter()
+    async with server:
+        results = await fetch_setpoints(DEFAULT_HOST, port, paths, connections)
+    elapsed = time.perf_counter() - start
+    failed = sum(status != 200 for status, _ in results)
+    return elapsed, failed
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Servidor de consignas pitch/roll para controladores de seguidores")
+    parser.add_argument('--sitios', default=None,
+                        help=f"CSV de sitios como en flota.py (por defecto {QUITO.name})")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="dirección de escucha")
+    parser.add_argument('--puerto', type=int, default=DEFAULT_PORT, help="puerto de escucha")
+    parser.add_argument('--retroseguimiento', action='store_true',
+                        help="aplica el retroseguimiento del campo de referencia de sombreado.py")
+    parser.add_argument('--prueba', type=int, default=None, metavar='SOLICITUDES',
+                        help="en lugar de servir, mide el rendimiento con el cliente local")
+    parser.add_argument('--conexiones', type=int, default=100,
+                        help="conexiones simultáneas del cliente de prueba")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.sitios:
+        from flota import load_sites
+        try:
+            sites = load_sites(args.sitios)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error: no se pudieron leer los sitios: {e}", file=sys.stderr)
+            return 2
+    else:
+        sites = [QUITO]
+    if not sites:
+        print("Error: la lista de sitios está vacía", file=sys.stderr)
+        return 2
+    field = None
+    if args.retroseguimiento:
+        from sombreado import DEFAULT_FIELD
+        field = DEFAULT_FIELD
+    service = SetpointService(sites, field)
+
+    if args.prueba is not None:
+        if args.prueba <= 0 or args.conexiones <= 0:
+            print("Error: las solicitudes y las conexiones deben ser positivas", file=sys.stderr)
+            return 2
+        elapsed, failed = asyncio.run(load_test(service, args.prueba, args.conexiones))
+        stats = service.stats()
+        print(f"{args.prueba} solicitudes en {elapsed:.2f} s ({args.prueba / elapsed:.0f}/s), "
+              f"{failed} fallidas; {stats['batches']} lotes, "
+              f"{stats['mean_batch']:.1f} solicitudes por lote (max {stats['largest_batch']})")
+        return 1 if failed else 0
+
+    async def serve():
+        server = await SetpointServer(service).start(args.host, args.puerto)
+        print(f"Sirviendo consignas en http://{args.host}:{args.puerto}/setpoint", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
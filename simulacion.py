@@ -0,0 +1,553 @@
+"""Simulación del seguidor solar sin interfaz gráfica.
+
+Permite calcular la posición solar y los ángulos pitch/roll del panel desde
+scripts o servidores sin pantalla. Este módulo no importa tkinter,
+tkcalendar ni matplotlib.
+
+Uso desde la línea de comandos::
+
+    python simulacion.py --fecha 2024-03-21 --hasta 2024-03-23 \\
+        --hora-inicio 6 --duracion 12 --intervalo 5 --salida datos.csv
+
+    # Un año continuo a un minuto, solo el resumen (memoria constante)
+    python simulacion.py --fecha 2024-01-01 --hora-inicio 0 --duracion 8784 \\
+        --intervalo 1 --continuo --resumen
+"""
+import argparse
+import csv
+import sys
+from collections import namedtuple
+from datetime import date as date_type, datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from pytz import timezone, UnknownTimeZoneError
+
+from efemerides import sun_position, sun_vectors
+from instrumentacion import measure
+from linea_tiempo import timeline, to_local, to_utc
+
+# ``altitude`` (metros sobre el nivel del mar) solo interviene en el modelo de
+# irradiancia de energia.py
+Site = namedtuple('Site', ['name', 'latitude', 'longitude', 'timezone', 'altitude'],
+                  defaults=(0.0,))
+
+# Configuración geográfica por defecto
+QUITO = Site("Quito, Ecuador", -0.2105367, -78.491614, "America/Guayaquil", 2850.0)
+
+COLUMNS = ('time', 'local_time', 'elevation', 'azimuth', 'pitch', 'roll', 'sun_vector')
+
+# Muestras por bloque en el modo de streaming
+CHUNK_SIZE = 65536
+
+# Paso adaptativo: cambio máximo de elevación/azimuth entre muestras (grados)
+# y paso mínimo al refinar (segundos)
+ADAPTIVE_TOLERANCE = 1.0
+MIN_STEP_SECONDS = 15
+
+# Un intervalo mayor que este múltiplo del mediano (y que una hora) es un
+# corte de la serie
+BREAK_FACTOR = 8
+MIN_BREAK_SECONDS = 3600
+
+
+def tracker_angles(elevations, azimuths):
+    """Deriva pitch y roll del panel a partir de la posición solar"""
+    elevations = np.asarray(elevations, dtype=np.float64)
+    pitch = 90 - elevations
+    roll = np.array(azimuths, dtype=np.float64)
+    return pitch, roll
+
+
+def _columns(times, local_times, site, angles=None):
+    """Calcula todas las columnas de la simulación para un bloque de instantes.
+
+    ``angles`` permite pasar (elevación, azimuth) ya calculados, por ejemplo
+    desde la caché de efemérides.
+    """
+    if angles is None:
+        with measure('sun_position'):
+            angles = sun_position(times, site.latitude, site.longitude)
+    elevations, azimuths = angles
+    pitch, roll = tracker_angles(elevations, azimuths)
+    return {
+        'time': times,
+        'local_time': local_times,
+        'elevation': elevations,
+        'azimuth': azimuths,
+        'pitch': pitch,
+        'roll': roll,
+        'sun_vector': sun_vectors(elevations, azimuths),
+    }
+
+
+def simulate_day(date, hour_start, duration_hours, time_step_minutes, site=QUITO, cache=None):
+    """Simula una ventana de un día y devuelve un diccionario de columnas.
+
+    ``time`` contiene los instantes en UTC y ``local_time`` la hora local de
+    pared del sitio, ambos como ``datetime64[s]``. Con ``cache`` (una
+    ``cache_efemerides.EphemerisCache``) la posición solar se toma de la caché.
+    """
+    return next(iter_day_chunks(date, hour_start, duration_hours, time_step_minutes,
+                                site, cache, chunk_size=None))
+
+
+def iter_day_chunks(date, hour_start, duration_hours, time_step_minutes, site=QUITO, cache=None,
+                    chunk_size=CHUNK_SIZE):
+    """Igual que ``simulate_day`` pero entrega la ventana en bloques.
+
+    Con ``chunk_size=None`` la ventana completa sale en un único bloque.
+    """
+    local_start = datetime.combine(date, datetime.min.time()) + timedelta(hours=hour_start)
+    step_seconds = time_step_minutes * 60
+    times, local_times = timeline(local_start, duration_hours * 3600, step_seconds, site.timezone)
+    chunk_size = chunk_size or max(len(times), 1)
+    for first in range(0, max(len(times), 1), chunk_size):
+        part = times[first:first + chunk_size]
+        angles = None
+        if cache is not None and len(part):
+            angles = cache.window(site, int(part[0].astype(np.int64)), len(part), step_seconds)
+        yield _columns(part, local_times[first:first + chunk_size], site, angles)
+
+
+def angular_steps(elevations, azimuths):
+    """Mayor cambio de elevación o azimuth entre muestras consecutivas (grados)"""
+    d_azimuth = np.abs((np.diff(azimuths) + 180) % 360 - 180)
+    return np.maximum(np.abs(np.diff(elevations)), d_azimuth)
+
+
+def adaptive_times(start_epoch, duration_seconds, max_step_seconds, site=QUITO,
+                   tolerance=ADAPTIVE_TOLERANCE, min_step_seconds=MIN_STEP_SECONDS):
+    """Línea de tiempo no uniforme refinada donde el sol se mueve rápido.
+
+    Parte de la rejilla uniforme de ``max_step_seconds`` y parte a la mitad
+    cada intervalo cuyo cambio de elevación o azimuth supera ``tolerance``,
+    hasta cumplirla o llegar a ``min_step_seconds``. Solo se calcula la
+    posición de los puntos nuevos. Devuelve (instantes Unix, elevaciones,
+    azimuths).
+    """
+    times = start_epoch + np.arange(0, duration_seconds, max_step_seconds, dtype=np.int64)
+    elevations, azimuths = sun_position(times, site.latitude, site.longitude)
+    while len(times) > 1:
+        gaps = np.diff(times)
+        split = (angular_steps(elevations, azimuths) > tolerance) & (gaps >= 2 * min_step_seconds)
+        if not split.any():
+            break
+        index = np.flatnonzero(split) + 1
+        middle = times[index - 1] + gaps[split] // 2
+        new_elevations, new_azimuths = sun_position(middle, site.latitude, site.longitude)
+        times = np.insert(times, index, middle)
+        elevations = np.insert(elevations, index, new_elevations)
+        azimuths = np.insert(azimuths, index, new_azimuths)
+    return times, elevations, azimuths
+
+
+def simulate_adaptive_day(date, hour_start, duration_hours, max_step_minutes, site=QUITO,
+                          tolerance=ADAPTIVE_TOLERANCE, min_step_seconds=MIN_STEP_SECONDS):
+    """Como ``simulate_day`` pero con paso adaptativo (ver ``adaptive_times``).
+
+    ``max_step_minutes`` es el paso de la rejilla inicial; los intervalos solo
+    se refinan, así que la línea de tiempo contiene todos sus nodos.
+    """
+    local_start = datetime.combine(date, datetime.min.time()) + timedelta(hours=hour_start)
+    start_epoch = int(to_utc(np.datetime64(local_start, 's'), site.timezone).astype(np.int64))
+    epochs, elevations, azimuths = adaptive_times(start_epoch, duration_hours * 3600,
+                                                  max_step_minutes * 60, site, tolerance,
+                                                  min_step_seconds)
+    times = epochs.astype('datetime64[s]')
+    return _columns(times, to_local(times, site.timezone), site, (elevations, azimuths))
+
+
+def series_breaks(gaps, typical=None):
+    """Intervalos entre muestras (s) que son cortes de la serie.
+
+    Un corte es un intervalo no positivo o mayor que ``BREAK_FACTOR`` veces
+    el típico (por defecto, el mediano de ``gaps``) y que ``MIN_BREAK_SECONDS``.
+    """
+    gaps = np.asarray(gaps, dtype=np.float64)
+    if typical is None:
+        typical = np.median(gaps) if len(gaps) else 0.0
+    return (gaps <= 0) | (gaps > max(BREAK_FACTOR * typical, MIN_BREAK_SECONDS))
+
+
+def sample_durations(times):
+    """Tiempo (s) que representa cada muestra: el intervalo hasta la siguiente.
+
+    La última muestra repite el intervalo anterior, así que en una rejilla
+    uniforme todas pesan lo mismo. Los cortes de la serie (la noche entre dos
+    ventanas diarias, o el cambio de sitio en una tabla de flota) no cuentan
+    como tiempo: esas muestras pesan el intervalo mediano.
+    """
+    t = np.asarray(times, dtype='datetime64[s]').astype(np.int64)
+    if len(t) < 2:
+        return np.ones(len(t))
+    gaps = np.diff(t).astype(np.float64)
+    typical = np.median(gaps)
+    breaks = series_breaks(gaps, typical)
+    if breaks.any():
+        gaps[breaks] = typical if typical > 0 else 1.0
+    return np.append(gaps, gaps[-1])
+
+
+def iter_days(start_date, end_date, hour_start, duration_hours, time_step_minutes, site=QUITO,
+              cache=None, tolerance=None):
+    """Genera la simulación día por día entre dos fechas (inclusive).
+
+    Con ``tolerance`` cada día usa paso adaptativo y ``time_step_minutes`` es
+    el paso máximo; en ese modo no se usa la caché.
+    """
+    day = start_date
+    while day <= end_date:
+        if tolerance is None:
+            yield simulate_day(day, hour_start, duration_hours, time_step_minutes, site, cache)
+        else:
+            yield simulate_adaptive_day(day, hour_start, duration_hours, time_step_minutes,
+                                        site, tolerance)
+        day += timedelta(days=1)
+
+
+def simulate(start_date, end_date, hour_start, duration_hours, time_step_minutes, site=QUITO,
+             cache=None):
+    """Simula la misma ventana horaria para cada día entre dos fechas (inclusive)"""
+    days = list(iter_days(start_date, end_date, hour_start, duration_hours,
+                          time_step_minutes, site, cache))
+    if not days:
+        raise ValueError("La fecha final es anterior a la fecha inicial")
+    return {name: np.concatenate([d[name] for d in days]) for name in COLUMNS}
+
+
+def stream(start, duration_hours, time_step_minutes, site=QUITO, chunk_size=CHUNK_SIZE):
+    """Simula un horizonte continuo entregando bloques de tamaño fijo.
+
+    ``start`` es la hora local (sin zona) del primer instante. Cada bloque
+    es un diccionario de columnas de a lo sumo ``chunk_size`` muestras, por
+    lo que la memoria no depende de la longitud del horizonte (un año a un
+    minuto son 525 600 muestras).
+    """
+    if chunk_size <= 0:
+        raise ValueError("El tamaño de bloque debe ser positivo")
+    start_utc = to_utc(np.datetime64(start, 's'), site.timezone)
+    step = np.timedelta64(time_step_minutes, 'm')
+    total = len(range(0, duration_hours * 60, time_step_minutes))
+    for first in range(0, total, chunk_size):
+        times = start_utc + np.arange(first, min(first + chunk_size, total)) * step
+        yield _columns(times, to_local(times, site.timezone), site)
+
+
+class SimulationResult:
+    """Resultado de una simulación guardado en columnas contiguas de NumPy.
+
+    Solo se guardan ``time`` (UTC, ``datetime64[s]``) y la elevación y el
+    azimuth en ``float32``: 16 bytes por muestra. Las demás columnas de
+    ``simulate_day`` salen de ellas (``local_time`` de la zona horaria del
+    sitio, ``pitch``/``roll`` de ``tracker_angles`` y ``sun_vector`` de
+    ``sun_vectors``) y se calculan al pedirlas, en ``float64``.
+
+    ``result['pitch']`` devuelve una columna, ``result[i:j]`` otro resultado
+    con vistas de las mismas columnas, ``angles(i)`` los ángulos de una
+    muestra sin derivar columnas completas y ``table`` el diccionario de
+    columnas que aceptan ``TrackingStats``, ``agregacion``, ``reporte`` y
+    ``almacenamiento``.
+    """
+
+    STORED_COLUMNS = ('time', 'elevation', 'azimuth')
+
+    def __init__(self, table, site=QUITO):
+        self.time = np.ascontiguousarray(table['time'], dtype='datetime64[s]')
+        self.elevation = np.ascontiguousarray(table['elevation'], dtype=np.float32)
+        self.azimuth = np.ascontiguousarray(table['azimuth'], dtype=np.float32)
+        self.site = site
+
+    @classmethod
+    def from_chunks(cls, chunks, site=QUITO):
+        """Une los bloques de ``iter_day_chunks`` en un solo resultado"""
+        chunks = list(chunks)
+        return cls({name: np.concatenate([c[name] for c in chunks])
+                    for name in cls.STORED_COLUMNS}, site)
+
+    def __len__(self):
+        return len(self.time)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == 'time':
+                return self.time
+            if key == 'local_time':
+                return to_local(self.time, self.site.timezone)
+            elevations, azimuths = self._angles()
+            if key == 'elevation':
+                return elevations
+            if key == 'azimuth':
+                return azimuths
+            if key == 'sun_vector':
+                return sun_vectors(elevations, azimuths)
+            if key in ('pitch', 'roll'):
+                return tracker_angles(elevations, azimuths)[key == 'roll']
+            raise KeyError(key)
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("Solo se admiten nombres de columna y cortes contiguos")
+        return SimulationResult({name: getattr(self, name)[key] for name in self.STORED_COLUMNS},
+                                self.site)
+
+    def _angles(self):
+        return self.elevation.astype(np.float64), self.azimuth.astype(np.float64)
+
+    @property
+    def table(self):
+        """Todas las columnas de ``COLUMNS``, derivadas en el momento"""
+        elevations, azimuths = self._angles()
+        pitch, roll = tracker_angles(elevations, azimuths)
+        return {
+            'time': self.time,
+            'local_time': to_local(self.time, self.site.timezone),
+            'elevation': elevations,
+            'azimuth': azimuths,
+            'pitch': pitch,
+            'roll': roll,
+            'sun_vector': sun_vectors(elevations, azimuths),
+        }
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.STORED_COLUMNS)
+
+    def angles(self, index):
+        """(elevación, azimuth, pitch, roll) de la muestra ``index`` en grados"""
+        elevation = float(self.elevation[index])
+        azimuth = float(self.azimuth[index])
+        pitch, roll = tracker_angles(elevation, azimuth)
+        return elevation, azimuth, float(pitch), float(roll)
+
+    def local_datetime(self, index):
+        """Instante ``index`` como ``datetime`` con la zona horaria del sitio"""
+        utc = datetime.fromtimestamp(int(self.time[index].astype(np.int64)), dt_timezone.utc)
+        return utc.astimezone(timezone(self.site.timezone))
+
+    def time_labels(self, unit='m'):
+        """Horas locales como texto ('HH:MM', o 'HH:MM:SS' con ``unit='s'``)"""
+        return [t[11:] for t in np.datetime_as_string(self['local_time'], unit=unit)]
+
+
+class TrackingStats:
+    """Acumula las estadísticas del seguimiento bloque a bloque.
+
+    Calcula las mismas cifras que el reporte (elevación máxima/mínima/promedio,
+    rango de azimuth y eficiencia) sin conservar las series completas.
+    """
+
+    def __init__(self, efficiency_threshold=10):
+        self.efficiency_threshold = efficiency_threshold
+        self.count = 0
+        self.duration = 0.0
+        self.good_duration = 0.0
+        self.elevation_sum = 0.0
+        self.max_elevation = -np.inf
+        self.max_elevation_time = None
+        self.min_elevation = np.inf
+        self.min_azimuth = np.inf
+        self.max_azimuth = -np.inf
+
+    def update(self, chunk):
+        elevations = np.asarray(chunk['elevation'])
+        if elevations.size == 0:
+            return self
+        azimuths = np.asarray(chunk['azimuth'])
+        idx = int(np.argmax(elevations))
+        if elevations[idx] > self.max_elevation:
+            self.max_elevation = float(elevations[idx])
+            self.max_elevation_time = chunk['local_time'][idx]
+        self.min_elevation = min(self.min_elevation, float(elevations.min()))
+        self.min_azimuth = min(self.min_azimuth, float(azimuths.min()))
+        self.max_azimuth = max(self.max_azimuth, float(azimuths.max()))
+        # Pesos por duración para que un paso no uniforme no sesgue los promedios
+        weights = sample_durations(chunk['time'])
+        self.elevation_sum += float(elevations @ weights)
+        self.good_duration += float(weights[elevations > self.efficiency_threshold].sum())
+        self.duration += float(weights.sum())
+        self.count += elevations.size
+        return self
+
+    @property
+    def mean_elevation(self):
+        return self.elevation_sum / self.duration if self.duration else 0.0
+
+    @property
+    def efficiency(self):
+        """Porcentaje del tiempo con elevación sobre el umbral"""
+        return self.good_duration / self.duration * 100 if self.duration else 0
+
+    def summary(self):
+        """Líneas del resumen estadístico con el formato del reporte"""
+        if not self.count:
+            return []
+        max_time = str(np.datetime64(self.max_elevation_time, 'm'))[11:16]
+        return [
+            f"• Elevacion maxima: {self.max_elevation:.1f}° a las {max_time}",
+            f"• Elevacion minima: {self.min_elevation:.1f}°",
+            f"• Elevacion promedio: {self.mean_elevation:.1f}°",
+            f"• Rango de azimuth: {self.min_azimuth:.1f}° a {self.max_azimuth:.1f}°",
+            f"• Tiempo de seguimiento: {self.count} mediciones",
+            f"• Eficiencia estimada: {self.efficiency:.1f}%"
+        ]
+
+
+CSV_HEADER = ['time_utc', 'local_time', 'elevation', 'azimuth', 'pitch', 'roll',
+              'sun_x', 'sun_y', 'sun_z']
+
+
+def write_csv(result, output, header=True, site_name=None):
+    """Escribe las columnas de una simulación en formato CSV.
+
+    Si se indica ``site_name`` se agrega una primera columna con el sitio.
+    """
+    writer = csv.writer(output)
+    prefix = [] if site_name is None else [site_name]
+    if header:
+        writer.writerow((['site'] if prefix else []) + CSV_HEADER)
+    for i in range(len(result['time'])):
+        sun = result['sun_vector'][i]
+        writer.writerow(prefix + [
+            f"{result['time'][i]}Z",
+            str(result['local_time'][i]),
+            f"{result['elevation'][i]:.4f}",
+            f"{result['azimuth'][i]:.4f}",
+            f"{result['pitch'][i]:.4f}",
+            f"{result['roll'][i]:.4f}",
+            f"{sun[0]:.6f}", f"{sun[1]:.6f}", f"{sun[2]:.6f}",
+        ])
+
+
+class CsvWriter:
+    """Escribe bloques de una simulación en CSV, con la misma interfaz que
+    ``almacenamiento.TableWriter``.
+
+    Para tablas de flota, ``sites`` traduce la columna ``site`` a nombres.
+    """
+
+    def __init__(self, path='-', sites=None):
+        self.sites = sites
+        self.output = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        self.header = True
+
+    def append(self, chunk):
+        site_name = None
+        if self.sites is not None and len(chunk['time']):
+            site_name = self.sites[chunk['site'][0]]
+        write_csv(chunk, self.output, self.header, site_name)
+        self.header = False
+
+    def close(self):
+        if self.output is not sys.stdout:
+            self.output.close()
+
+
+def open_writer(fmt, path, sites=None):
+    """Abre un escritor de bloques en formato 'csv' o 'columnar'"""
+    if fmt == 'columnar':
+        from almacenamiento import TableWriter
+        return TableWriter(path, sites=sites)
+    return CsvWriter(path, sites)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Simulación del seguidor solar 2-DOF sin interfaz gráfica")
+    parser.add_argument('--fecha', type=date_type.fromisoformat, default=date_type.today(),
+                        help="fecha inicial (AAAA-MM-DD), por defecto hoy")
+    parser.add_argument('--hasta', type=date_type.fromisoformat, default=None,
+                        help="fecha final inclusive (AAAA-MM-DD), por defecto igual a --fecha")
+    parser.add_argument('--hora-inicio', type=int, default=6, help="hora local de inicio")
+    parser.add_argument('--duracion', type=int, default=12, help="duración diaria en horas")
+    parser.add_argument('--intervalo', type=int, default=15, help="intervalo en minutos")
+    parser.add_argument('--nombre', default=QUITO.name, help="nombre del sitio")
+    parser.add_argument('--lat', type=float, default=QUITO.latitude, help="latitud (grados)")
+    parser.add_argument('--lon', type=float, default=QUITO.longitude, help="longitud (grados)")
+    parser.add_argument('--zona', default=QUITO.timezone, help="zona horaria IANA del sitio")
+    parser.add_argument('--altitud', type=float, default=QUITO.altitude,
+                        help="altitud del sitio en metros (modelo de irradiancia)")
+    parser.add_argument('--continuo', action='store_true',
+                        help="simula un horizonte continuo de --duracion horas desde --hora-inicio")
+    parser.add_argument('--resumen', action='store_true',
+                        help="escribe solo el resumen estadístico y energético en lugar de la tabla")
+    parser.add_argument('--adaptativo', type=float, default=None, metavar='TOLERANCIA',
+                        help="paso adaptativo: refina donde la elevación o el azimuth cambian "
+                             "más de TOLERANCIA grados por paso (--intervalo es el paso máximo)")
+    parser.add_argument('--cache', action='store_true',
+                        help="usa la caché de efemérides en disco (ver cache_efemerides.py)")
+    parser.add_argument('--formato', choices=('csv', 'columnar'), default='csv',
+                        help="csv, o columnar (directorio binario, ver almacenamiento.py)")
+    parser.add_argument('--salida', default='-',
+                        help="archivo CSV o directorio columnar de salida ('-' = stdout)")
+    parser.add_argument('--perfil', default=None, metavar='ARCHIVO',
+                        help="mide los tiempos por etapa y los guarda en ARCHIVO (JSON)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.intervalo <= 0 or args.duracion <= 0:
+        print("Error: la duración y el intervalo deben ser positivos", file=sys.stderr)
+        return 2
+    if args.continuo and (args.hasta or args.adaptativo is not None):
+        print("Error: --continuo no se puede combinar con --hasta ni --adaptativo",
+              file=sys.stderr)
+        return 2
+    if args.adaptativo is not None and args.adaptativo <= 0:
+        print("Error: la tolerancia adaptativa debe ser positiva", file=sys.stderr)
+        return 2
+    site = Site(args.nombre, args.lat, args.lon, args.zona, args.altitud)
+    end_date = args.hasta or args.fecha
+    if end_date < args.fecha:
+        print("Error: la fecha final es anterior a la fecha inicial", file=sys.stderr)
+        return 2
+
+    if args.continuo:
+        start = datetime.combine(args.fecha, datetime.min.time()) + timedelta(hours=args.hora_inicio)
+        chunks = stream(start, args.duracion, args.intervalo, site)
+    else:
+        cache = None
+        if args.cache:
+            from cache_efemerides import EphemerisCache
+            cache = EphemerisCache()
+        chunks = iter_days(args.fecha, end_date, args.hora_inicio, args.duracion,
+                           args.intervalo, site, cache, args.adaptativo)
+
+    if args.formato == 'columnar' and args.salida == '-' and not args.resumen:
+        print("Error: el formato columnar necesita --salida", file=sys.stderr)
+        return 2
+    if args.perfil:
+        import instrumentacion
+        instrumentacion.enable()
+
+    writer = None if args.resumen else open_writer(args.formato, args.salida)
+    try:
+        stats = TrackingStats()
+        energy = None
+        if args.resumen:
+            from energia import EnergyYield
+            energy = EnergyYield(site.latitude, site.altitude)
+        for chunk in chunks:
+            stats.update(chunk)
+            if energy is not None:
+                energy.update(chunk)
+            if writer is not None:
+                writer.append(chunk)
+        if args.resumen:
+            summary = "\n".join(stats.summary() + energy.summary())
+            if args.salida == '-':
+                print(summary)
+            else:
+                with open(args.salida, 'w', encoding='utf-8') as output:
+                    output.write(summary + "\n")
+    except UnknownTimeZoneError:
+        print(f"Error: zona horaria desconocida: {args.zona}", file=sys.stderr)
+        return 2
+    finally:
+        if writer is not None:
+            writer.close()
+    if args.perfil:
+        instrumentacion.dump_json(args.perfil)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
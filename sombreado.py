@@ -0,0 +1,325 @@
+"""Sombreado entre seguidores de un campo y retroseguimiento (backtracking).
+
+El campo es una rejilla de ``rows`` x ``columns`` seguidores de 2 grados de
+libertad: las filas están separadas ``row_pitch`` en dirección norte-sur y
+las columnas ``column_pitch`` en dirección este-oeste, todos con el pivote a
+la misma altura y el panel de ``panel_width`` x ``panel_height`` (las
+dimensiones de la escena 3D, ``height`` a lo largo del eje ``u`` del panel
+como en ``escena.create_panel_vertices``).
+
+Como todos los paneles tienen la misma orientación, la sombra de un vecino
+sobre un panel es el mismo rectángulo desplazado: se proyecta el centro del
+vecino sobre el plano del panel en la dirección del sol. Cada panel se
+muestrea con una rejilla de 8 x 8 puntos empaquetada en un ``uint64`` por
+vecino y por instante, así que la unión de las sombras de varios vecinos es
+un OR de bits y la fracción sombreada un conteo de bits. Con 8 puntos por
+lado, la sombra muestreada de un vecino difiere de la exacta en menos de una
+franja de 1/8 del panel por eje, así que el error de su fracción sombreada
+es menor que 2/8 - 1/64 (23 %) del área. Con instantes y orientaciones
+aleatorias el máximo medido es del 11 % y la media del 2 %.
+
+Solo importan los vecinos a ``reach`` filas/columnas o menos, y un
+seguidor solo se distingue de otro por los vecinos que le faltan al estar
+cerca del borde: el campo se resume en a lo sumo (2·reach + 1)² clases de
+seguidores con su peso, de modo que el costo no depende del tamaño del
+campo.
+
+El retroseguimiento conserva el azimuth del panel y reduce el pitch (la
+inclinación) lo mínimo para que ningún vecino lo sombree, buscándolo por
+bisección para todas las muestras a la vez. Un panel horizontal nunca
+sombrea a otro a la misma altura, así que siempre existe solución.
+
+Uso desde la línea de comandos (un año a 5 minutos, campo de 20 x 50)::
+
+    python sombreado.py --fecha 2024-01-01 --hasta 2024-12-31 --intervalo 5 \\
+        --filas 20 --columnas 50 --paso-filas 2 --paso-columnas 1.25
+"""
+import argparse
+import sys
+from collections import namedtuple
+from datetime import date as date_type
+
+import numpy as np
+
+from energia import clear_sky
+from simulacion import QUITO, Site, iter_days, sample_durations
+
+# Mismas dimensiones por defecto que el panel de la escena 3D
+FieldLayout = namedtuple('FieldLayout', ['rows', 'columns', 'row_pitch', 'column_pitch',
+                                         'panel_width', 'panel_height'],
+                         defaults=(0.5, 0.8))
+
+DEFAULT_FIELD = FieldLayout(5, 10, 2.0, 1.25)
+
+# Vecinos considerados en cada dirección
+NEIGHBOR_REACH = 2
+
+# Puntos de muestreo por lado del panel (8 x 8 = los 64 bits de un uint64)
+GRID_SIDE = 8
+
+# Iteraciones de la bisección del retroseguimiento (90° / 2**16 < 0.002°)
+BACKTRACK_ITERATIONS = 16
+
+FIELD_COLUMNS = ('shaded_fraction', 'max_shaded_fraction', 'backtrack_pitch',
+                 'backtrack_roll', 'backtrack_cosine')
+
+_LOW_BITS = np.array([(1 << k) - 1 for k in range(GRID_SIDE + 1)], dtype=np.uint64)
+_LOW_BYTES = np.array([(1 << (8 * k)) - 1 for k in range(GRID_SIDE + 1)], dtype=np.uint64)
+_REPEAT_BYTE = np.uint64(0x0101010101010101)
+_BYTE_BITS = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+
+# np.bitwise_count apareció en NumPy 2.0
+_bitwise_count = getattr(np, 'bitwise_count', None)
+
+
+def _popcount(masks):
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if _bitwise_count is not None:
+        return _bitwise_count(masks)
+    return _BYTE_BITS[masks.view(np.uint8)].reshape(*masks.shape, 8).sum(axis=-1)
+
+
+def neighbor_offsets(layout, reach=NEIGHBOR_REACH):
+    """Índices (fila, columna) relativos y desplazamientos (K, 3) de los vecinos"""
+    steps = [(i, j) for i in range(-reach, reach + 1) for j in range(-reach, reach + 1)
+             if (i, j) != (0, 0)]
+    index = np.array(steps)
+    offsets = np.zeros((len(steps), 3))
+    offsets[:, 0] = index[:, 1] * layout.column_pitch  # x = este
+    offsets[:, 1] = index[:, 0] * layout.row_pitch     # y = norte
+    return index, offsets
+
+
+def tracker_classes(layout, index, reach=NEIGHBOR_REACH):
+    """Clases de seguidores según los vecinos que tienen: (máscaras (C, K), pesos (C,))"""
+    def border_counts(n):
+        counts = {}
+        for k in range(n):
+            key = (min(k, reach), min(n - 1 - k, reach))
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    masks = []
+    weights = []
+    total = layout.rows * layout.columns
+    for (south, north), row_count in border_counts(layout.rows).items():
+        for (west, east), column_count in border_counts(layout.columns).items():
+            masks.append((index[:, 0] >= -south) & (index[:, 0] <= north)
+                         & (index[:, 1] >= -west) & (index[:, 1] <= east))
+            weights.append(row_count * column_count / total)
+    return np.array(masks).reshape(-1, len(index)), np.array(weights)
+
+
+def panel_axes(normals):
+    """Ejes (u, v) del plano del panel con el convenio de ``escena``"""
+    normals = np.asarray(normals, dtype=np.float64)
+    u = np.cross([0.0, 1.0, 0.0], normals)
+    length = np.linalg.norm(u, axis=-1, keepdims=True)
+    u = np.where(length > 1e-12, u / np.where(length > 1e-12, length, 1.0), [1.0, 0.0, 0.0])
+    v = np.cross(normals, u)
+    return u, v / np.linalg.norm(v, axis=-1, keepdims=True)
+
+
+def pitch_roll_normals(pitch, roll):
+    """Normal del panel para pitch (inclinación) y roll (azimuth) en grados"""
+    p = np.radians(pitch)
+    r = np.radians(roll)
+    return np.stack([np.sin(p) * np.sin(r), np.sin(p) * np.cos(r), np.cos(p)], axis=-1)
+
+
+def _shadow_offsets(sun, normals, offsets):
+    """Posición (du, dv) de la sombra de cada vecino en el plano del panel.
+
+    Devuelve también qué vecinos están entre el panel y el sol (K, T).
+    """
+    u, v = panel_axes(normals)
+    facing = np.einsum('ij,ij->i', sun, normals)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (offsets @ normals.T) / facing
+    du = offsets @ u.T - t * np.einsum('ij,ij->i', sun, u)
+    dv = offsets @ v.T - t * np.einsum('ij,ij->i', sun, v)
+    in_front = (t > 0) & (facing > 0) & (sun[:, 2] > 0)
+    return du, dv, in_front
+
+
+def _index_range(position, side):
+    """Puntos de muestreo [i0, i1) que cubre un rectángulo desplazado ``position`` lados"""
+    start = np.clip(np.ceil(position - 0.5), 0, side).astype(np.intp)
+    stop = np.clip(np.floor(position + side - 0.5) + 1, 0, side).astype(np.intp)
+    return start, np.maximum(stop, start)
+
+
+def shadow_masks(sun, normals, offsets, layout):
+    """Bits de los puntos del panel que sombrea cada vecino: ``uint64`` (K, T)"""
+    du, dv, in_front = _shadow_offsets(sun, normals, offsets)
+    u0, u1 = _index_range(du / layout.panel_height * GRID_SIDE, GRID_SIDE)
+    v0, v1 = _index_range(dv / layout.panel_width * GRID_SIDE, GRID_SIDE)
+    masks = ((_LOW_BITS[u1] - _LOW_BITS[u0]) * _REPEAT_BYTE) & (_LOW_BYTES[v1] ^ _LOW_BYTES[v0])
+    return np.where(in_front, masks, np.uint64(0))
+
+
+def shaded_fractions(sun, normals, layout, reach=NEIGHBOR_REACH):
+    """Fracción sombreada media del campo y la del seguidor más sombreado (T,)"""
+    index, offsets = neighbor_offsets(layout, reach)
+    masks = shadow_masks(sun, normals, offsets, layout)
+    classes, weights = tracker_classes(layout, index, reach)
+    fractions = np.stack([_popcount(np.bitwise_or.reduce(masks[c], axis=0))
+                          for c in classes]) / GRID_SIDE ** 2
+    return weights @ fractions, fractions.max(axis=0)
+
+
+def _shaded(sun, normals, offsets, layout):
+    """Si algún vecino sombrea el panel (geometría exacta, sin muestreo)"""
+    du, dv, in_front = _shadow_offsets(sun, normals, offsets)
+    tolerance = 1e-9
+    overlap = ((np.abs(du) < layout.panel_height - tolerance)
+               & (np.abs(dv) < layout.panel_width - tolerance))
+    return np.any(in_front & overlap, axis=0)
+
+
+def backtrack_pitch(sun, pitch, roll, layout, reach=NEIGHBOR_REACH,
+                    iterations=BACKTRACK_ITERATIONS):
+    """Mayor pitch (≤ el de seguimiento) sin sombra de ningún vecino"""
+    _, offsets = neighbor_offsets(layout, reach)
+    pitch = np.asarray(pitch, dtype=np.float64)
+    result = pitch.copy()
+    todo = np.flatnonzero((sun[:, 2] > 0)
+                          & _shaded(sun, pitch_roll_normals(pitch, roll), offsets, layout))
+    if len(todo) == 0:
+        return result
+    low = np.zeros(len(todo))  # horizontal: nunca hay sombra
+    high = pitch[todo]
+    sun, roll = sun[todo], np.asarray(roll)[todo]
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        shaded = _shaded(sun, pitch_roll_normals(middle, roll), offsets, layout)
+        high = np.where(shaded, middle, high)
+        low = np.where(shaded, low, middle)
+    result[todo] = low
+    return result
+
+
+def field_shading(chunk, layout=DEFAULT_FIELD, reach=NEIGHBOR_REACH):
+    """Sombreado y retroseguimiento del campo para un bloque de la simulación.
+
+    Devuelve un diccionario de columnas (ver ``FIELD_COLUMNS``): fracción
+    sombreada media y máxima siguiendo al sol, y el programa de
+    retroseguimiento (pitch, roll y coseno entre la normal y el sol, 0 de
+    noche). Las muestras con el sol bajo el horizonte no se evalúan.
+    """
+    sun = np.asarray(chunk['sun_vector'], dtype=np.float64)
+    pitch = np.asarray(chunk['pitch'], dtype=np.float64)
+    roll = np.asarray(chunk['roll'], dtype=np.float64)
+    day = np.flatnonzero(sun[:, 2] > 0)
+    mean = np.zeros(len(sun))
+    worst = np.zeros(len(sun))
+    if len(day):
+        mean[day], worst[day] = shaded_fractions(sun[day], sun[day], layout, reach)
+    backtracked = pitch.copy()
+    backtracked[day] = backtrack_pitch(sun[day], pitch[day], roll[day], layout, reach)
+    cosine = np.einsum('ij,ij->i', pitch_roll_normals(backtracked, roll), sun)
+    return {
+        'shaded_fraction': mean,
+        'max_shaded_fraction': worst,
+        'backtrack_pitch': backtracked,
+        'backtrack_roll': roll,
+        'backtrack_cosine': np.where(sun[:, 2] > 0, cosine, 0.0),
+    }
+
+
+class ShadingStats:
+    """Acumula pérdidas por sombreado y por retroseguimiento bloque a bloque.
+
+    Las pérdidas se ponderan con la irradiancia directa de cielo despejado
+    (ver ``energia.clear_sky``) y con el tiempo que representa cada muestra,
+    igual que ``simulacion.TrackingStats``.
+    """
+
+    def __init__(self, layout=DEFAULT_FIELD, altitude_m=0.0, reach=NEIGHBOR_REACH):
+        self.layout = layout
+        self.altitude_m = altitude_m
+        self.reach = reach
+        self.beam = 0.0
+        self.shading_loss = 0.0
+        self.backtrack_loss = 0.0
+        self.shaded_seconds = 0.0
+        self.backtrack_seconds = 0.0
+
+    def update(self, chunk):
+        if len(chunk['time']) == 0:
+            return self
+        field = field_shading(chunk, self.layout, self.reach)
+        dni, _, _ = clear_sky(chunk['time'], chunk['elevation'], self.altitude_m)
+        weights = sample_durations(chunk['time'])
+        beam = dni * weights
+        self.beam += float(beam.sum())
+        self.shading_loss += float(beam @ field['shaded_fraction'])
+        self.backtrack_loss += float(beam @ (1 - field['backtrack_cosine']))
+        lit = dni > 0
+        self.shaded_seconds += float(weights[lit & (field['shaded_fraction'] > 0)].sum())
+        backtracking = field['backtrack_pitch'] < np.asarray(chunk['pitch']) - 1e-6
+        self.backtrack_seconds += float(weights[lit & backtracking].sum())
+        return self
+
+    def summary(self):
+        """Líneas de resumen con el formato del reporte"""
+        if not self.beam:
+            return []
+        return [
+            f"• Sombreado entre filas: {self.shading_loss / self.beam * 100:.1f}% de la directa, "
+            f"{self.shaded_seconds / 3600:.1f} h con sombra",
+            f"• Retroseguimiento: {self.backtrack_loss / self.beam * 100:.1f}% de perdida por "
+            f"coseno, {self.backtrack_seconds / 3600:.1f} h activo",
+        ]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Sombreado entre filas y retroseguimiento de un campo de seguidores")
+    parser.add_argument('--fecha', type=date_type.fromisoformat, default=date_type.today(),
+                        help="fecha inicial (AAAA-MM-DD), por defecto hoy")
+    parser.add_argument('--hasta', type=date_type.fromisoformat, default=None,
+                        help="fecha final inclusive (AAAA-MM-DD), por defecto igual a --fecha")
+    parser.add_argument('--intervalo', type=int, default=5, help="intervalo en minutos")
+    parser.add_argument('--lat', type=float, default=QUITO.latitude, help="latitud (grados)")
+    parser.add_argument('--lon', type=float, default=QUITO.longitude, help="longitud (grados)")
+    parser.add_argument('--zona', default=QUITO.timezone, help="zona horaria IANA del sitio")
+    parser.add_argument('--altitud', type=float, default=QUITO.altitude,
+                        help="altitud del sitio en metros (modelo de irradiancia)")
+    parser.add_argument('--filas', type=int, default=DEFAULT_FIELD.rows,
+                        help="filas del campo (separadas de norte a sur)")
+    parser.add_argument('--columnas', type=int, default=DEFAULT_FIELD.columns,
+                        help="seguidores por fila (separados de este a oeste)")
+    parser.add_argument('--paso-filas', type=float, default=DEFAULT_FIELD.row_pitch,
+                        help="distancia entre filas, en las unidades del panel")
+    parser.add_argument('--paso-columnas', type=float, default=DEFAULT_FIELD.column_pitch,
+                        help="distancia entre seguidores de una fila")
+    parser.add_argument('--ancho', type=float, default=DEFAULT_FIELD.panel_width,
+                        help="ancho del panel")
+    parser.add_argument('--alto', type=float, default=DEFAULT_FIELD.panel_height,
+                        help="alto del panel")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    layout = FieldLayout(args.filas, args.columnas, args.paso_filas, args.paso_columnas,
+                         args.ancho, args.alto)
+    if args.intervalo <= 0 or min(layout) <= 0:
+        print("Error: el intervalo y las dimensiones del campo deben ser positivos",
+              file=sys.stderr)
+        return 2
+    end_date = args.hasta or args.fecha
+    if end_date < args.fecha:
+        print("Error: la fecha final es anterior a la fecha inicial", file=sys.stderr)
+        return 2
+    site = Site("Sitio", args.lat, args.lon, args.zona, args.altitud)
+    stats = ShadingStats(layout, site.altitude)
+    for chunk in iter_days(args.fecha, end_date, 0, 24, args.intervalo, site):
+        stats.update(chunk)
+    print("\n".join(stats.summary()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""Pruebas del integrador de energía de ``energia.EnergyYield``"""
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from energia import MOUNTS, EnergyYield
+from simulacion import QUITO, iter_days, simulate
+
+
+def _yield(days, chunked=True):
+    start = date(2024, 3, 21)
+    end = start + timedelta(days=days - 1)
+    chunks = iter_days(start, end, 8, 8, 5) if chunked else [simulate(start, end, 8, 8, 5)]
+    energy = EnergyYield(QUITO.latitude, QUITO.altitude)
+    for chunk in chunks:
+        energy.update(chunk)
+    return energy.kwh_per_m2()
+
+
+@pytest.mark.parametrize('chunked', [True, False])
+def test_yield_scales_with_days(chunked):
+    """La noche entre dos ventanas diarias no se integra"""
+    one = _yield(1, chunked)
+    for days in (2, 5):
+        several = _yield(days, chunked)
+        for mount in MOUNTS:
+            assert several[mount] == pytest.approx(days * one[mount], rel=0.01)
+
+
+def test_chunking_does_not_change_yield():
+    chunked = _yield(3, chunked=True)
+    whole = _yield(3, chunked=False)
+    assert np.allclose([chunked[m] for m in MOUNTS], [whole[m] for m in MOUNTS])
@@ -0,0 +1,53 @@
+"""Pruebas de la conversión UTC <-> hora local de ``linea_tiempo`` frente a pytz"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+import pytest
+from pytz import timezone
+
+from linea_tiempo import timeline, to_local, to_utc
+
+ZONES = ('America/Guayaquil', 'America/New_York', 'America/Santiago', 'Europe/Madrid',
+         'Europe/London', 'Australia/Sydney', 'Australia/Lord_Howe', 'Asia/Kolkata')
+
+# Cada 30 minutos durante 2024: cubre los cambios de horario de ambos hemisferios
+UTC = np.arange(np.datetime64('2024-01-01T00:00:00'), np.datetime64('2025-01-01T00:00:00'),
+                np.timedelta64(30, 'm')).astype('datetime64[s]')
+
+
+def _epochs(values):
+    return np.asarray(values, dtype='datetime64[s]').astype(np.int64)
+
+
+def _naive(moments):
+    return np.array([m.replace(tzinfo=None) for m in moments], dtype='datetime64[s]')
+
+
+@pytest.mark.parametrize('zone', ZONES)
+def test_to_local_matches_pytz(zone):
+    tz = timezone(zone)
+    expected = _naive(datetime.fromtimestamp(int(t), dt_timezone.utc).astimezone(tz)
+                      for t in _epochs(UTC))
+    assert np.array_equal(to_local(UTC, zone), expected)
+
+
+@pytest.mark.parametrize('zone', ZONES)
+def test_to_utc_matches_pytz(zone):
+    """Incluye las horas inexistentes y ambiguas de cada cambio de horario"""
+    tz = timezone(zone)
+    # Rejilla uniforme en hora de pared: pasa por los saltos y las repeticiones
+    local = np.arange(np.datetime64('2024-01-01T00:00'), np.datetime64('2025-01-01T00:00'),
+                      np.timedelta64(15, 'm')).astype('datetime64[s]')
+    expected = _naive(tz.localize(t, is_dst=False).astimezone(dt_timezone.utc)
+                      for t in local.astype(datetime))
+    assert np.array_equal(to_utc(local, zone), expected)
+
+
+@pytest.mark.parametrize('zone', ZONES)
+def test_timeline_is_uniform_across_transitions(zone):
+    utc, local = timeline(datetime(2024, 3, 1), 240 * 24 * 3600, 600, zone)
+    assert np.all(np.diff(_epochs(utc)) == 600)
+    assert np.array_equal(local, to_local(utc, zone))
+    start = timezone(zone).localize(datetime(2024, 3, 1), is_dst=False)
+    assert _epochs(utc[:1])[0] == int(start.timestamp())
+    assert utc[-1] - utc[0] == np.timedelta64(timedelta(days=240) - timedelta(minutes=10))
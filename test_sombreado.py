@@ -0,0 +1,37 @@
+"""Pruebas del muestreo por máscaras de bits de ``sombreado``"""
+import numpy as np
+
+from sombreado import (DEFAULT_FIELD, GRID_SIDE, _popcount, _shadow_offsets, neighbor_offsets,
+                       pitch_roll_normals, shadow_masks)
+
+
+def _random_geometry(count=50000, seed=0):
+    rng = np.random.default_rng(seed)
+    sun = pitch_roll_normals(90 - rng.uniform(2, 90, count), rng.uniform(0, 360, count))
+    normals = pitch_roll_normals(rng.uniform(0, 80, count), rng.uniform(0, 360, count))
+    return sun, normals
+
+
+def test_mask_error_per_neighbor_is_bounded():
+    """Menos de una franja de 1/8 por eje frente a la superposición exacta"""
+    layout = DEFAULT_FIELD
+    sun, normals = _random_geometry()
+    _, offsets = neighbor_offsets(layout)
+    du, dv, in_front = _shadow_offsets(sun, normals, offsets)
+    exact_u = np.clip(1 - np.abs(du) / layout.panel_height, 0, 1)
+    exact_v = np.clip(1 - np.abs(dv) / layout.panel_width, 0, 1)
+    masks = shadow_masks(sun, normals, offsets, layout)
+
+    assert not masks[~in_front].any()
+    # Cada byte no nulo es una fila del rectángulo: filas y puntos por fila
+    shaded = masks != 0
+    rows = masks.view(np.uint8).reshape(*masks.shape, 8)
+    sampled_v = np.count_nonzero(rows, axis=-1) / GRID_SIDE
+    sampled_u = _popcount(rows.max(axis=-1).astype(np.uint64)) / GRID_SIDE
+    side = 1 / GRID_SIDE
+    assert np.all(np.abs(sampled_u - exact_u)[shaded] < side)
+    assert np.all(np.abs(sampled_v - exact_v)[shaded] < side)
+
+    sampled = _popcount(masks) / GRID_SIDE ** 2
+    exact = np.where(in_front, exact_u * exact_v, 0.0)
+    assert np.abs(sampled - exact).max() < 2 * side - side ** 2